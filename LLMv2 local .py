@@ -2,11 +2,13 @@ from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
 import json
 import time
-import re
 import os
 from datetime import datetime
 import logging
 
+from code_extraction import extract_code_from_response
+from LLMv2 import decode_new_tokens
+
 # Determine model path based on environment
 def get_model_path():
     """Get the appropriate model path based on the environment."""
@@ -33,49 +35,6 @@ def get_model_path():
 
 MODEL_NAME = get_model_path() 
 
-def extract_code_from_response(response_text):
-    """Extract only the code from the LLM response, removing thinking/narrative.
-
-    Strategy:
-    1) Strip <think>...</think> blocks if present.
-    2) Prefer fenced code blocks (any language). If multiple, return the first clean one.
-    3) If no fences, try to detect code by finding the first code token and return from there.
-    4) If nothing code-like is detected, return an empty string to avoid prose leakage.
-    """
-    if not response_text:
-        return ""
-
-    # Remove thinking process and common preambles
-    response_text = re.sub(r"<think>[\s\S]*?</think>", "", response_text, flags=re.DOTALL)
-    response_text = re.sub(r"(?i)^(thoughts?|reasoning|analysis)\s*:.*?$", "", response_text, flags=re.MULTILINE)
-    
-    # Remove repetitive patterns (like the output shows)
-    response_text = re.sub(r"(That's the function\.|The code is correct\.|The function is correct\.|Yes, the function returns.*?Therefore, the code is correct\.)", "", response_text, flags=re.MULTILINE)
-    response_text = re.sub(r"Sample Input:.*?Sample Output:.*?(?=\n|$)", "", response_text, flags=re.DOTALL)
-
-    # Prefer fenced code blocks of any language
-    fenced_blocks = re.findall(r"```[a-zA-Z0-9_+-]*\s*([\s\S]*?)\s*```", response_text)
-    if fenced_blocks:
-        # Choose the first clean block (not repetitive)
-        for block in fenced_blocks:
-            clean_block = block.strip()
-            if clean_block and len(clean_block) > 10:  # Avoid empty or very short blocks
-                return clean_block
-        # If no clean block found, return the first one
-        return fenced_blocks[0].strip() if fenced_blocks else ""
-
-    # Heuristic fallback: try to start from first code-ish token
-    code_start = re.search(r"(^|\n)\s*(def |class |import |from |@|if __name__ == ['\"]__main__['\"]:)", response_text)
-    if code_start:
-        candidate = response_text[code_start.start():].strip()
-        # Truncate trailing non-code sections if they start with typical prose markers
-        candidate = re.split(r"\n\s*(Explanation|Notes?|Output|Result|Example|That's|The code|The function|Yes, the function|Sample Input)\s*:|\n\s*#\s*End", candidate)[0]
-        return candidate.strip()
-
-    # No detectable code found; return empty to avoid dumping narrative into JSON
-    return ""
-
-
 def generate_code_with_retry(tokenizer, model, prompt, device, max_retries=3):
     """Generate code with retry logic for better reliability."""
     
@@ -91,11 +50,8 @@ def generate_code_with_retry(tokenizer, model, prompt, device, max_retries=3):
             full_prompt = instruction + prompt
             inputs = tokenizer(full_prompt, return_tensors="pt").to(device)
             outputs = model.generate(**inputs, max_new_tokens=512, temperature=0.7, do_sample=True)
-            raw_response = tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Remove the input prompt from the output
-            if raw_response.startswith(full_prompt):
-                raw_response = raw_response[len(full_prompt):].strip()
+            # Decode only the completion; the prompt tokens are sliced off, not string-matched
+            raw_response = decode_new_tokens(tokenizer, outputs, inputs["input_ids"].shape[1])[0].strip()
             
             # Extract only the code
             code_only = extract_code_from_response(raw_response)
@@ -181,8 +137,6 @@ def main():
             log_llm_duration(lang, start_wall, end_wall, duration, success=False, error_message=str(e))
             print(f"Error generating code for {lang}: {e}")
             llm_outputs[lang] = None
-        
-        time.sleep(1)  # Be nice to your GPU, avoid overheating
 
     # Save results
     with open("data/llm_output.json", "w", encoding="utf-8") as f:
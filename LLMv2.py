@@ -1,77 +1,143 @@
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers import (
+    AutoTokenizer, AutoModelForCausalLM, DynamicCache, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+)
 import torch
+import copy
+import threading
+import queue
 import json
 import time
-import re
 import os
 from datetime import datetime
 import logging
 
+from code_extraction import extract_code_from_response, IncrementalCodeExtractor
+from llm_backends import (
+    GenerationBackend, INSTRUCTIONS, CODE_FENCE, DEFAULT_MAX_NEW_TOKENS, DEFAULT_STOP_STRINGS, instruction_for_attempt
+)
+
 MODEL_NAME = "Qwen/Qwen3-30B-A3B-Instruct-2507"  # Use Hugging Face default cache directory 
 
-def extract_code_from_response(response_text):
-    """Extract only the code from the LLM response, removing thinking/narrative.
+DEFAULT_MAX_BATCH_SIZE = 8
+# Longest wait for the next streamed chunk before giving up on a generate call
+STREAM_TIMEOUT_S = 600.0
+
 
-    Strategy:
-    1) Strip <think>...</think> blocks if present.
-    2) Prefer fenced code blocks (any language). If multiple, return the first clean one.
-    3) If no fences, try to detect code by finding the first code token and return from there.
-    4) If nothing code-like is detected, return an empty string to avoid prose leakage.
+def decode_new_tokens(tokenizer, outputs, prompt_length):
+    """Decode only the tokens generated after the prompt, one string per row.
+
+    ``prompt_length`` is the (padded) input length passed to ``generate``; slicing
+    there avoids decoding the prompt and avoids fragile prefix matching on text.
     """
-    if not response_text:
-        return ""
+    return tokenizer.batch_decode(outputs[:, prompt_length:], skip_special_tokens=True)
 
-    # Remove thinking process and common preambles
-    response_text = re.sub(r"<think>[\s\S]*?</think>", "", response_text, flags=re.DOTALL)
-    response_text = re.sub(r"(?i)^(thoughts?|reasoning|analysis)\s*:.*?$", "", response_text, flags=re.MULTILINE)
-    
-    # Remove repetitive patterns (like the output shows)
-    response_text = re.sub(r"(That's the function\.|The code is correct\.|The function is correct\.|Yes, the function returns.*?Therefore, the code is correct\.)", "", response_text, flags=re.MULTILINE)
-    response_text = re.sub(r"Sample Input:.*?Sample Output:.*?(?=\n|$)", "", response_text, flags=re.DOTALL)
-
-    # Prefer fenced code blocks of any language
-    fenced_blocks = re.findall(r"```[a-zA-Z0-9_+-]*\s*([\s\S]*?)\s*```", response_text)
-    if fenced_blocks:
-        # Choose the first clean block (not repetitive)
-        for block in fenced_blocks:
-            clean_block = block.strip()
-            if clean_block and len(clean_block) > 10:  # Avoid empty or very short blocks
-                return clean_block
-        # If no clean block found, return the first one
-        return fenced_blocks[0].strip() if fenced_blocks else ""
-
-    # Heuristic fallback: try to start from first code-ish token
-    code_start = re.search(r"(^|\n)\s*(def |class |import |from |@|if __name__ == ['\"]__main__['\"]:)", response_text)
-    if code_start:
-        candidate = response_text[code_start.start():].strip()
-        # Truncate trailing non-code sections if they start with typical prose markers
-        candidate = re.split(r"\n\s*(Explanation|Notes?|Output|Result|Example|That's|The code|The function|Yes, the function|Sample Input)\s*:|\n\s*#\s*End", candidate)[0]
-        return candidate.strip()
-
-    # No detectable code found; return empty to avoid dumping narrative into JSON
-    return ""
+
+class CodeBlockStoppingCriteria(StoppingCriteria):
+    """Stop each row once its completion contains a closed code fence or a stop string.
+
+    Stop strings only count in prose before the opening fence: inside the code
+    block "Explanation:" may be part of a comment or string literal. Rows are checked independently, so one finished row does not stop the batch.
+    ``stopped_at[i]`` records how many tokens row ``i`` had generated when it stopped.
+
+    Each call only decodes the tokens added since the previous call plus a short
+    window of context (``window`` tokens), and carries the fence count and the end
+    of the text seen so far, so the cost per step does not grow with the completion.
+    """
+
+    FENCE = CODE_FENCE
+
+    def __init__(self, tokenizer, prompt_length, stop_strings=DEFAULT_STOP_STRINGS, window=16):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.stop_strings = tuple(stop_strings or ())
+        self.window = window
+        self.stopped_at = {}
+        # Per row: tokens already checked, closed fences so far, text after the
+        # last counted fence and the end of the text (for matches spanning steps)
+        self._checked = {}
+        self._fences = {}
+        self._fence_tail = {}
+        self._text_tail = {}
+        self._tail_length = max([len(stop) for stop in self.stop_strings] + [len(self.FENCE)]) - 1
+
+    def _new_text(self, row_ids, checked, generated):
+        """Text decoded from the tokens after ``checked``, using a short window of earlier tokens as context."""
+        start = self.prompt_length + max(0, checked - self.window)
+        before = self.tokenizer.decode(row_ids[start:self.prompt_length + checked], skip_special_tokens=True)
+        after = self.tokenizer.decode(row_ids[start:self.prompt_length + generated], skip_special_tokens=True)
+        # Usually ``after`` extends ``before``; a multi-byte character completed by
+        # the new tokens replaces the placeholder decoded for its first bytes
+        common = len(before) if after.startswith(before) else len(os.path.commonprefix([before, after]))
+        return after[common:]
+
+    def _is_complete(self, row, text):
+        fence_tail = self._fence_tail.get(row, "")
+        fence_text = fence_tail + text
+        fences_before = fences = self._fences.get(row, 0)
+        position = opening = fence_text.find(self.FENCE)
+        last_end = 0
+        while position != -1:
+            fences += 1
+            last_end = position + len(self.FENCE)
+            position = fence_text.find(self.FENCE, last_end)
+        self._fences[row] = fences
+        self._fence_tail[row] = fence_text[last_end:][-(len(self.FENCE) - 1):]
+        if fences >= 2:
+            return True
+        if fences_before:
+            # Inside the code block
+            return False
+        if fences:
+            # Only the prose before the fence this text opened
+            text = fence_text[len(fence_tail):max(len(fence_tail), opening)]
+
+        text = self._text_tail.get(row, "") + text
+        self._text_tail[row] = text[-self._tail_length:] if self._tail_length else ""
+        return any(stop in text for stop in self.stop_strings)
+
+    def __call__(self, input_ids, scores, **kwargs):
+        generated = input_ids.shape[1] - self.prompt_length
+        done = []
+        for row in range(input_ids.shape[0]):
+            if row not in self.stopped_at:
+                checked = self._checked.get(row, 0)
+                self._checked[row] = generated
+                if self._is_complete(row, self._new_text(input_ids[row], checked, generated)):
+                    self.stopped_at[row] = generated
+            done.append(row in self.stopped_at)
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+    def tokens_saved(self, max_new_tokens):
+        """Tokens not generated because rows stopped before ``max_new_tokens``."""
+        return sum(max_new_tokens - generated for generated in self.stopped_at.values())
+
+
+def log_generate_call(batch_size, tokens_generated, tokens_saved, seconds):
+    logging.info(
+        f"phase=generate_call\tbatch={batch_size}\ttokens_generated={tokens_generated}"
+        f"\ttokens_saved={tokens_saved}\tduration_s={seconds:.2f}"
+    )
 
 
 def generate_code_with_retry(tokenizer, model, prompt, device, max_retries=3):
     """Generate code with retry logic for better reliability."""
     
-    # First attempt with standard instruction
-    instruction = (
-        "You are to output ONLY Python code that solves the user's request. "
-        "Respond with a single fenced block using ```python ... ```. "
-        "Do not include any explanations, narration, or thinking outside the fence.\n\n"
-    )
-    
     for attempt in range(max_retries):
         try:
-            full_prompt = instruction + prompt
+            start_perf = time.perf_counter()
+            full_prompt = instruction_for_attempt(attempt) + prompt
             inputs = tokenizer(full_prompt, return_tensors="pt").to(device)
-            outputs = model.generate(**inputs, max_new_tokens=512, temperature=0.7, do_sample=True)
-            raw_response = tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Remove the input prompt from the output
-            if raw_response.startswith(full_prompt):
-                raw_response = raw_response[len(full_prompt):].strip()
+            prompt_length = inputs["input_ids"].shape[1]
+            stopping = CodeBlockStoppingCriteria(tokenizer, prompt_length)
+            outputs = model.generate(
+                **inputs, max_new_tokens=DEFAULT_MAX_NEW_TOKENS, temperature=0.7, do_sample=True,
+                stopping_criteria=StoppingCriteriaList([stopping])
+            )
+            # A single unpadded row: everything after the prompt was generated
+            log_generate_call(1, outputs.shape[1] - prompt_length, stopping.tokens_saved(DEFAULT_MAX_NEW_TOKENS),
+                              time.perf_counter() - start_perf)
+            # Decode only the completion; the prompt tokens are sliced off, not string-matched
+            raw_response = decode_new_tokens(tokenizer, outputs, prompt_length)[0].strip()
             
             # Extract only the code
             code_only = extract_code_from_response(raw_response)
@@ -83,16 +149,6 @@ def generate_code_with_retry(tokenizer, model, prompt, device, max_retries=3):
             
             # If no code detected and this isn't the last attempt, try with stricter instruction
             if attempt < max_retries - 1:
-                if attempt == 0:
-                    instruction = (
-                        "Return ONLY a single fenced Python block with the final code. "
-                        "Absolutely no prose. If you cannot, return an empty code block.\n\n"
-                    )
-                else:
-                    instruction = (
-                        "ONLY output Python code. No explanations, no examples, no testing. "
-                        "Just the code in a fenced block: ```python\n[code here]\n```\n\n"
-                    )
                 print(f"  Retry attempt {attempt + 1} with stricter instruction...")
             
         except Exception as e:
@@ -105,6 +161,356 @@ def generate_code_with_retry(tokenizer, model, prompt, device, max_retries=3):
     return ""
 
 
+def prepare_tokenizer_for_batching(tokenizer):
+    """Decoder-only models need left padding and a pad token to generate in batches."""
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+
+def _is_out_of_memory(exc):
+    if isinstance(exc, torch.cuda.OutOfMemoryError):
+        return True
+    message = str(exc).lower()
+    return "out of memory" in message or "can't allocate memory" in message
+
+
+class GenerationGovernor:
+    """Optional throttle applied after each generate call.
+
+    ``max_tokens_per_second`` caps measured generation throughput and
+    ``duty_cycle`` (0 < d <= 1) caps the fraction of wall time the device
+    spends generating. Both default to ``None``, which means no delay at all.
+    """
+
+    def __init__(self, max_tokens_per_second=None, duty_cycle=None):
+        if duty_cycle is not None and not 0 < duty_cycle <= 1:
+            raise ValueError(f"duty_cycle must be in (0, 1], got {duty_cycle}")
+        self.max_tokens_per_second = max_tokens_per_second
+        self.duty_cycle = duty_cycle
+        self.total_delay = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.max_tokens_per_second) or (self.duty_cycle is not None and self.duty_cycle < 1)
+
+    def pause_after(self, tokens, seconds):
+        """Sleep as needed after a call that produced ``tokens`` in ``seconds``; returns the delay."""
+        delay = 0.0
+        if self.max_tokens_per_second:
+            delay = max(delay, tokens / self.max_tokens_per_second - seconds)
+        if self.duty_cycle is not None and self.duty_cycle < 1:
+            delay = max(delay, seconds * (1 - self.duty_cycle) / self.duty_cycle)
+        if delay > 0:
+            time.sleep(delay)
+            self.total_delay += delay
+        return delay
+
+
+class PrefixCache:
+    """Past-key-values for each instruction preamble, computed once per session.
+
+    Every request starts with one of the ``INSTRUCTIONS`` strings, so their
+    prefill is done once here and reused: a batch is laid out as
+    ``[prefix][padding][prompt]`` with padding masked out, and generation only
+    runs the prompt tokens on top of a copy of the cached prefix. The prompt is
+    tokenized separately from the instruction, which every instruction's
+    trailing blank line makes a clean token boundary.
+    """
+
+    def __init__(self, tokenizer, model, device, instructions=INSTRUCTIONS):
+        self.entries = {}
+        for instruction in instructions:
+            prefix_ids = tokenizer(instruction, return_tensors="pt")["input_ids"].to(device)
+            with torch.no_grad():
+                past_key_values = model(input_ids=prefix_ids, use_cache=True).past_key_values
+            if isinstance(past_key_values, tuple):
+                past_key_values = DynamicCache.from_legacy_cache(past_key_values)
+            self.entries[instruction] = (prefix_ids[0].tolist(), past_key_values)
+
+    def __contains__(self, instruction):
+        return instruction in self.entries
+
+    def build_inputs(self, tokenizer, instruction, prompts, device):
+        """Return ``(inputs, past_key_values)`` for prompts that share ``instruction``."""
+        prefix_ids, cached = self.entries[instruction]
+        suffixes = [tokenizer(prompt, add_special_tokens=False)["input_ids"] for prompt in prompts]
+        width = max(len(suffix) for suffix in suffixes)
+        rows, masks = [], []
+        for suffix in suffixes:
+            padding = width - len(suffix)
+            rows.append(prefix_ids + [tokenizer.pad_token_id] * padding + suffix)
+            masks.append([1] * len(prefix_ids) + [0] * padding + [1] * len(suffix))
+
+        # generate() extends the cache in place, so each call works on its own copy
+        past_key_values = copy.deepcopy(cached)
+        past_key_values.batch_repeat_interleave(len(prompts))
+        inputs = {
+            "input_ids": torch.tensor(rows, device=device),
+            "attention_mask": torch.tensor(masks, device=device),
+        }
+        return inputs, past_key_values
+
+
+def _generate_raw_batch(tokenizer, model, instruction, prompts, device, max_new_tokens=DEFAULT_MAX_NEW_TOKENS,
+                        stop_strings=DEFAULT_STOP_STRINGS, prefix_cache=None):
+    """Run one generate call for prompts sharing the same instruction.
+
+    Uses the cached instruction prefix when ``prefix_cache`` has it, otherwise
+    left-pads ``instruction + prompt``. Generation of a row ends early once its
+    fenced block closes or a stop string appears. Returns
+    ``(completions, new_token_count)`` where ``new_token_count`` is the number
+    of non-padding tokens generated across the batch.
+    """
+    start_perf = time.perf_counter()
+    generate_kwargs = {}
+    if prefix_cache is not None and instruction in prefix_cache and all(prompts):
+        inputs, generate_kwargs["past_key_values"] = prefix_cache.build_inputs(tokenizer, instruction, prompts, device)
+    else:
+        inputs = tokenizer([instruction + prompt for prompt in prompts], return_tensors="pt", padding=True).to(device)
+    prompt_length = inputs["input_ids"].shape[1]
+    stopping = CodeBlockStoppingCriteria(tokenizer, prompt_length, stop_strings)
+    with torch.no_grad():
+        outputs = model.generate(
+            **inputs,
+            **generate_kwargs,
+            max_new_tokens=max_new_tokens,
+            temperature=0.7,
+            do_sample=True,
+            pad_token_id=tokenizer.pad_token_id,
+            stopping_criteria=StoppingCriteriaList([stopping]),
+        )
+    # Every row's completion starts at the same offset
+    new_tokens = outputs[:, prompt_length:]
+    new_token_count = int((new_tokens != tokenizer.pad_token_id).sum())
+    log_generate_call(len(prompts), new_token_count, stopping.tokens_saved(max_new_tokens),
+                      time.perf_counter() - start_perf)
+    return decode_new_tokens(tokenizer, outputs, prompt_length), new_token_count
+
+
+def generate_code_batch(tokenizer, model, prompts, device, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_retries=3,
+                        governor=None, stop_strings=DEFAULT_STOP_STRINGS, prefix_cache=None):
+    """Generate code for many independent prompts using batched generation.
+
+    Prompts are run in left-padded batches of at most ``max_batch_size``. When a
+    batch runs out of memory the batch size is halved and the batch retried.
+    Each item is scheduled on its own: items that yield code are finalized at
+    once, while items without code are re-queued into a later batch with the
+    next (stricter) instruction, up to ``max_retries`` attempts in total.
+
+    A batch only holds items on the same attempt, so it shares one instruction
+    whose prefill can come from ``prefix_cache``. Each row stops as soon as its
+    fenced block closes or one of ``stop_strings`` is generated. If a
+    ``GenerationGovernor`` is given it may pause after each batch.
+
+    Returns ``(codes, retry_counts)``, both in input order. ``retry_counts[i]``
+    is the number of extra attempts item ``i`` needed.
+    """
+    prepare_tokenizer_for_batching(tokenizer)
+    codes = [""] * len(prompts)
+    retry_counts = [0] * len(prompts)
+    pending = list(range(len(prompts)))
+
+    batch_size = max(1, max_batch_size)
+    while pending:
+        attempt = retry_counts[pending[0]]
+        batch = [i for i in pending if retry_counts[i] == attempt][:batch_size]
+        start_perf = time.perf_counter()
+        try:
+            raw_responses, new_token_count = _generate_raw_batch(
+                tokenizer, model, instruction_for_attempt(attempt), [prompts[i] for i in batch], device,
+                stop_strings=stop_strings, prefix_cache=prefix_cache
+            )
+        except Exception as e:
+            if not _is_out_of_memory(e) or batch_size == 1:
+                raise
+            batch_size = max(1, batch_size // 2)
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            print(f"  Out of memory; splitting into batches of {batch_size}")
+            continue
+
+        if governor is not None:
+            governor.pause_after(new_token_count, time.perf_counter() - start_perf)
+
+        batched = set(batch)
+        pending = [i for i in pending if i not in batched]
+        for i, raw_response in zip(batch, raw_responses):
+            code_only = extract_code_from_response(raw_response)
+            if code_only.strip():
+                codes[i] = code_only
+                print(f"  Item {i + 1}: extracted code on attempt {retry_counts[i] + 1}")
+            elif retry_counts[i] + 1 < max_retries:
+                retry_counts[i] += 1
+                pending.append(i)
+                print(f"  Item {i + 1}: no code, re-queued with stricter instruction (retry {retry_counts[i]})")
+            else:
+                print(f"  Item {i + 1}: all attempts failed to produce clean code")
+
+    return codes, retry_counts
+
+
+def stream_code(tokenizer, model, instruction, prompt, device, max_new_tokens=DEFAULT_MAX_NEW_TOKENS,
+                stop_strings=DEFAULT_STOP_STRINGS, prefix_cache=None, timeout=STREAM_TIMEOUT_S):
+    """Generate for a single prompt, yielding ``(chunk, extractor)`` as text is produced.
+
+    ``generate`` runs on a background thread feeding a ``TextIteratorStreamer``;
+    each decoded chunk is passed through an ``IncrementalCodeExtractor`` so the
+    caller can act as soon as the fenced block closes. An exception raised by
+    ``generate`` is re-raised here once the stream ends, and ``TimeoutError`` is
+    raised if no chunk arrives for ``timeout`` seconds.
+    """
+    if prefix_cache is not None and instruction in prefix_cache and prompt:
+        inputs, past_key_values = prefix_cache.build_inputs(tokenizer, instruction, [prompt], device)
+        inputs["past_key_values"] = past_key_values
+    else:
+        inputs = dict(tokenizer(instruction + prompt, return_tensors="pt").to(device))
+    prompt_length = inputs["input_ids"].shape[1]
+    stopping = CodeBlockStoppingCriteria(tokenizer, prompt_length, stop_strings)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=timeout)
+    outputs = []
+    errors = []
+
+    def run():
+        try:
+            with torch.no_grad():
+                outputs.append(model.generate(
+                    **inputs,
+                    max_new_tokens=max_new_tokens,
+                    temperature=0.7,
+                    do_sample=True,
+                    pad_token_id=tokenizer.pad_token_id,
+                    stopping_criteria=StoppingCriteriaList([stopping]),
+                    streamer=streamer,
+                ))
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            # generate only ends the stream when it returns normally; without
+            # this a failed call would leave the loop below waiting forever
+            streamer.end()
+
+    start_perf = time.perf_counter()
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    extractor = IncrementalCodeExtractor()
+    timed_out = False
+    try:
+        for chunk in streamer:
+            if chunk:
+                extractor.feed(chunk)
+                yield chunk, extractor
+    except queue.Empty:
+        timed_out = True
+        raise TimeoutError(f"No output streamed for {timeout:.0f}s") from None
+    finally:
+        # A stalled worker is a daemon thread; don't block on it after a timeout
+        if not timed_out:
+            worker.join()
+    if errors:
+        raise errors[0]
+    # A single unpadded row: everything after the prompt was generated
+    log_generate_call(1, outputs[0].shape[1] - prompt_length, stopping.tokens_saved(max_new_tokens),
+                      time.perf_counter() - start_perf)
+
+
+def generate_code_streaming(tokenizer, model, prompt, device, max_retries=3, stop_strings=DEFAULT_STOP_STRINGS,
+                            prefix_cache=None, on_chunk=None):
+    """Streaming version of ``generate_code_with_retry``.
+
+    ``on_chunk(chunk, extractor)`` is called for every streamed chunk. Returns
+    ``(code, retry_count, metrics)`` where ``metrics`` holds the time to first
+    token (``ttft_s``), total time (``duration_s``) and chunk count of the final
+    attempt.
+    """
+    code_only = ""
+    metrics = {}
+    for attempt in range(max_retries):
+        start_perf = time.perf_counter()
+        metrics = {"ttft_s": None, "duration_s": None, "chunks": 0}
+        extractor = None
+        for chunk, extractor in stream_code(
+            tokenizer, model, instruction_for_attempt(attempt), prompt, device,
+            stop_strings=stop_strings, prefix_cache=prefix_cache
+        ):
+            if metrics["ttft_s"] is None:
+                metrics["ttft_s"] = time.perf_counter() - start_perf
+            metrics["chunks"] += 1
+            if on_chunk is not None:
+                on_chunk(chunk, extractor)
+        metrics["duration_s"] = time.perf_counter() - start_perf
+
+        code_only = extractor.code if extractor is not None else ""
+        if code_only.strip():
+            print(f"  Successfully extracted code on attempt {attempt + 1}")
+            return code_only, attempt, metrics
+        if attempt < max_retries - 1:
+            print(f"  Retry attempt {attempt + 1} with stricter instruction...")
+
+    print("  All attempts failed to produce clean code")
+    return code_only, max_retries - 1, metrics
+
+
+class ModelSession(GenerationBackend):
+    """Tokenizer, model and device loaded once and reused for every prompt in a run."""
+
+    name = "transformers"
+
+    def __init__(self, model_name=MODEL_NAME, device=None, max_batch_size=DEFAULT_MAX_BATCH_SIZE, governor=None,
+                 stop_strings=DEFAULT_STOP_STRINGS, use_prefix_cache=True):
+        super().__init__(model_name, max_batch_size=max_batch_size)
+        self.governor = governor
+        self.stop_strings = stop_strings
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+
+        print(f"Loading model: {model_name}")
+        start_perf = time.perf_counter()
+        self.load_started = time.time()
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            device_map="auto",
+            torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32
+        )
+        self.load_finished = time.time()
+        self.load_seconds = time.perf_counter() - start_perf
+        print(f"Model loaded in {self.load_seconds:.1f}s")
+
+        self.prefix_cache = None
+        if use_prefix_cache:
+            prepare_tokenizer_for_batching(self.tokenizer)
+            start_perf = time.perf_counter()
+            self.prefix_cache = PrefixCache(self.tokenizer, self.model, self.device)
+            print(f"Cached instruction prefixes in {time.perf_counter() - start_perf:.1f}s")
+
+    def complete(self, text):
+        """Raw completion for one full prompt (instruction included)."""
+        prepare_tokenizer_for_batching(self.tokenizer)
+        completions, _ = _generate_raw_batch(self.tokenizer, self.model, "", [text], self.device,
+                                             stop_strings=self.stop_strings)
+        return completions[0]
+
+    def generate(self, prompt, max_retries=3):
+        """Generate code for a single prompt using the already-loaded model."""
+        return generate_code_with_retry(self.tokenizer, self.model, prompt, self.device, max_retries=max_retries)
+
+    def generate_batch(self, prompts, max_retries=3):
+        """Generate code for a list of prompts in batches; returns ``(codes, retry_counts)``."""
+        return generate_code_batch(
+            self.tokenizer, self.model, prompts, self.device,
+            max_batch_size=self.max_batch_size, max_retries=max_retries, governor=self.governor,
+            stop_strings=self.stop_strings, prefix_cache=self.prefix_cache
+        )
+
+    def generate_streaming(self, prompt, max_retries=3, on_chunk=None):
+        """Stream generation for one prompt; returns ``(code, retry_count, metrics)``."""
+        prepare_tokenizer_for_batching(self.tokenizer)
+        return generate_code_streaming(
+            self.tokenizer, self.model, prompt, self.device, max_retries=max_retries,
+            stop_strings=self.stop_strings, prefix_cache=self.prefix_cache, on_chunk=on_chunk
+        )
+
+
 def setup_logger():
     logging.basicConfig(
         filename="data/llm_runtime.log",
@@ -122,43 +528,35 @@ def log_llm_duration(language, start_ts, end_ts, seconds, success=True, error_me
     else:
         logging.error(f"lang={language}\tstart={start_iso}\tend={end_iso}\tduration_min={minutes:.3f}\terror={error_message}")
 
+def log_model_load(model_name, start_ts, end_ts, seconds):
+    start_iso = datetime.fromtimestamp(start_ts).isoformat(timespec="seconds")
+    end_iso = datetime.fromtimestamp(end_ts).isoformat(timespec="seconds")
+    logging.info(f"model={model_name}\tphase=load\tstart={start_iso}\tend={end_iso}\tduration_min={seconds / 60.0:.3f}")
+
 def main():
     setup_logger()
-    device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    # Load model and tokenizer
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForCausalLM.from_pretrained(MODEL_NAME, device_map="auto", torch_dtype=torch.float16)
+    # Load model and tokenizer once for the whole run
+    session = ModelSession(MODEL_NAME)
+    log_model_load(session.model_name, session.load_started, session.load_finished, session.load_seconds)
 
     # Load prompts
     with open("data/translated_prompts.json", "r", encoding="utf-8") as f:
         translations = json.load(f)
 
-    llm_outputs = {}
-    for lang, prompt in translations.items():
-        if not prompt:
-            llm_outputs[lang] = None
-            continue
+    llm_outputs = {lang: None for lang in translations}
+    langs = [lang for lang, prompt in translations.items() if prompt]
 
-        print(f"Generating code for language: {lang}")
-        start_perf = time.perf_counter()
-        start_wall = time.time()
-        try:
-            # Use the new retry function for better reliability
-            code_only = generate_code_with_retry(tokenizer, model, prompt, device)
-            end_wall = time.time()
-            duration = time.perf_counter() - start_perf
-            log_llm_duration(lang, start_wall, end_wall, duration, success=True)
-            llm_outputs[lang] = code_only
-            print(f"Generated code: {code_only[:100]}...")
-        except Exception as e:
-            end_wall = time.time()
-            duration = time.perf_counter() - start_perf
-            log_llm_duration(lang, start_wall, end_wall, duration, success=False, error_message=str(e))
-            print(f"Error generating code for {lang}: {e}")
-            llm_outputs[lang] = None
-        
-        time.sleep(1)  # Be nice to your GPU, avoid overheating
+    print(f"Generating code for languages: {', '.join(langs)}")
+    codes, _, errors = session.generate_each(
+        [translations[lang] for lang in langs], labels=langs, log_duration=log_llm_duration
+    )
+    for lang, code_only, error in zip(langs, codes, errors):
+        if error is not None:
+            print(f"Error generating code for {lang}: {error}")
+            continue
+        llm_outputs[lang] = code_only
+        print(f"Generated code for {lang}: {code_only[:100]}...")
 
     # Save results
     with open("data/llm_output.json", "w", encoding="utf-8") as f:
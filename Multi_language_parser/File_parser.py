@@ -2,14 +2,25 @@
 import os
 import git
 import shutil
+import sys
 from typing import Dict, List, Any
 from pathlib import Path
-from language_build import get_parser
+from language_build import PARSER_DIR, get_parser, get_element_query
+
+# Default clone directory, next to this module rather than in the working directory
+REPOS_DIR = os.path.join(PARSER_DIR, 'cloned_repos')
 
 class RepoElementParser:
-    def __init__(self, repos_dir="cloned_repos"):
+    def __init__(self, repos_dir=REPOS_DIR, query_languages=None):
         self.repos_dir = repos_dir
         self.supported_extensions = {'.py', '.java', '.cpp', '.c', '.js'}  # Add more as needed
+
+        # Languages ('python', 'java', ...) whose elements are extracted with the
+        # tree-sitter queries in queries/<language>.scm instead of the Python tree
+        # walk; defaults to the comma-separated EXTRACTION_QUERY_LANGUAGES
+        if query_languages is None:
+            query_languages = os.environ.get('EXTRACTION_QUERY_LANGUAGES', '').split(',')
+        self.query_languages = {name.strip() for name in query_languages if name.strip()}
         
         # Create directory for cloned repos if it doesn't exist
         os.makedirs(repos_dir, exist_ok=True)
@@ -74,92 +85,163 @@ class RepoElementParser:
                     source_files.append(full_path)
         return source_files
 
-    def _is_docstring(self, node) -> bool:
-        """Determine if a string node is a docstring."""
+    def _is_docstring(self, node, parent=None, grand_parent=None, first_statements=None) -> bool:
+        """Determine if a string node is a docstring.
+
+        ``parent`` and ``grand_parent`` of ``node`` may be passed in when the
+        caller already knows them; otherwise they are looked up on the node.
+        ``first_statements`` is a per-tree dict that remembers each module's or
+        block's first statement, so a module with thousands of strings does
+        not rescan its children for every one of them.
+        """
         if node.type != 'expression_statement':
             return False
             
-        parent = node.parent
+        if parent is None:
+            parent = node.parent
         if not parent:
             return False
             
         if parent.type == 'module':
-            for child in parent.children:
-                if child.type not in ('comment', 'line_comment'):
-                    return child == node
+            return self._first_statement(parent, first_statements) == node
         elif parent.type == 'block':
-            grand_parent = parent.parent
+            if grand_parent is None:
+                grand_parent = parent.parent
             if not grand_parent or grand_parent.type not in ('class_definition', 'function_definition'):
                 return False
-            for child in parent.children:
-                if child.type not in ('comment', 'line_comment'):
-                    return child == node
+            return self._first_statement(parent, first_statements) == node
                     
         return False
 
+    @staticmethod
+    def _first_statement(parent, first_statements=None):
+        """First child of ``parent`` that is not a comment (None if there is none).
+
+        Steps a cursor over the leading comments instead of building the
+        whole children list; the result is cached in ``first_statements``
+        under the parent's node id when a dict is given.
+        """
+        if first_statements is not None and parent.id in first_statements:
+            return first_statements[parent.id]
+        first = None
+        cursor = parent.walk()
+        if cursor.goto_first_child():
+            while True:
+                if cursor.node.type not in ('comment', 'line_comment'):
+                    first = cursor.node
+                    break
+                if not cursor.goto_next_sibling():
+                    break
+        if first_statements is not None:
+            first_statements[parent.id] = first
+        return first
+
     def _is_std_lib_identifier(self, name: str) -> bool:
         """Check if an identifier is from the standard library."""
         return name in self.std_lib_identifiers
 
-    def _collect_class_names(self, node, class_names):
-        """First pass: Collect all class names in the AST."""
-        # Handle different language-specific class definitions
-        if node.type in ('class_definition', 'class_declaration', 'class_specifier', 'struct_specifier'):
-            # For Python, Java, JavaScript classes
-            if node.type in ('class_definition', 'class_declaration'):
-                for child in node.children:
-                    if child.type == 'identifier':
-                        class_name = child.text.decode('utf8')
-                        class_names.add(class_name)
-                        break
-            # For C++ classes and C structs
-            elif node.type in ('class_specifier', 'struct_specifier'):
-                for child in node.children:
-                    if child.type == 'type_identifier':
-                        class_name = child.text.decode('utf8')
-                        class_names.add(class_name)
-                        break
-        
-        for child in node.children:
-            self._collect_class_names(child, class_names)
+    @staticmethod
+    def _walk(node):
+        """Yield ``(node, ancestors)`` for ``node`` and its descendants in pre-order.
 
-    def _is_variable(self, node, class_names=None) -> bool:
-        """Determine if an identifier node represents a variable."""
+        Iterates with a tree-sitter TreeCursor instead of recursing through
+        ``node.children``, so deeply nested files cannot hit Python's
+        recursion limit. ``ancestors`` is an explicit stack of the nodes above
+        the current one (nearest last), padded with None above the starting
+        node; it is updated in place, so read it before advancing the walk.
+        Node.parent walks down from the root in tree-sitter, so callers should
+        take parents from this stack instead.
+        """
+        cursor = node.walk()
+        ancestors = [None, None, None]
+        while True:
+            current = cursor.node
+            yield current, ancestors
+            if cursor.goto_first_child():
+                ancestors.append(current)
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return
+                ancestors.pop()
+
+    def _is_variable(self, node, class_names=None, parent=None, grand_parent=None, name=None) -> bool:
+        """Determine if an identifier node represents a variable.
+
+        ``parent``, ``grand_parent`` and the identifier's ``name`` are looked
+        up on the node unless given.
+        """
         if node.type != 'identifier':
             return False
-        name = node.text.decode('utf8')
+        if parent is None:
+            parent = node.parent
+        if grand_parent is None and parent:
+            grand_parent = parent.parent
+        if name is None:
+            name = node.text.decode('utf8')
         if self._is_std_lib_identifier(name):
             return False
         if class_names and name in class_names:
             return False
-        if node.parent and node.parent.type in ('function_definition', 'class_definition', 'constructor_declaration', 'constructor_or_destructor_definition'):
+        if parent and parent.type in ('function_definition', 'class_definition', 'constructor_declaration', 'constructor_or_destructor_definition'):
             return False
-        if node.parent and node.parent.type == 'call':
+        if parent and parent.type == 'call':
             return False
-        if node.parent and node.parent.type in ('import_statement', 'import_from_statement'):
+        if parent and parent.type in ('import_statement', 'import_from_statement'):
             return False
         if name in ('__name__', '__main__', '__file__', 'this', 'super'):
             return False
-        if node.parent and node.parent.type == 'method_definition':
+        if parent and parent.type == 'method_definition':
             return False
-        if node.parent and node.parent.type == 'function_definition':
+        if parent and parent.type == 'function_definition':
             return False
-        if node.parent and node.parent.type == 'class_definition':
+        if parent and parent.type == 'class_definition':
             return False
-        if node.parent and node.parent.parent and node.parent.parent.type == 'class_definition':
-            if node.parent.type == 'block' and any(child.type == 'method_definition' for child in node.parent.children):
+        if parent and grand_parent and grand_parent.type == 'class_definition':
+            if parent.type == 'block' and any(child.type == 'method_definition' for child in parent.children):
                 return False
-        if node.parent and node.parent.parent and node.parent.parent.type == 'function_definition':
-            if node.parent.type == 'block' and any(child.type == 'method_definition' for child in node.parent.children):
+        if parent and grand_parent and grand_parent.type == 'function_definition':
+            if parent.type == 'block' and any(child.type == 'method_definition' for child in parent.children):
                 return False
-        if node.parent and node.parent.parent and node.parent.parent.type == 'class_definition':
-            if node.parent.type == 'block' and any(child.type == 'function_definition' for child in node.parent.children):
+        if parent and grand_parent and grand_parent.type == 'class_definition':
+            if parent.type == 'block' and any(child.type == 'function_definition' for child in parent.children):
                 return False
         return True
 
-    def _extract_elements(self, node, source_code: bytes, class_names=None) -> None:
+    def _extract_elements(self, node, source_code: bytes) -> None:
+        """Extract the elements of ``node`` and everything below it in a single walk.
+
+        Identifiers named after a class are not variables, but a class can be
+        defined after its name is used, so variables are collected as
+        candidates and the class names seen anywhere in the tree are removed
+        once the walk is done.
+        """
+        class_names = set()
+        first_statements = {}
+        for descendant, ancestors in self._walk(node):
+            self._extract_node(descendant, source_code, class_names,
+                               ancestors[-1], ancestors[-2], ancestors[-3], first_statements)
+        self.elements['variables'] -= class_names
+
+    @staticmethod
+    def _node_text(node, source_code: bytes) -> str:
+        """Text of ``node``, sliced from the file's bytes (Node.text copies them out of the tree)."""
+        return source_code[node.start_byte:node.end_byte].decode('utf8')
+
+    def _node_name(self, node, source_code: bytes) -> str:
+        """Interned text of an identifier node; the same names recur throughout a repository."""
+        return sys.intern(self._node_text(node, source_code))
+
+    def _extract_node(self, node, source_code: bytes, class_names,
+                      parent=None, grand_parent=None, great_grand_parent=None, first_statements=None) -> None:
+        """Record the elements contributed by a single node (not its children).
+
+        Class names are added to ``class_names`` (std-lib names included);
+        variables are recorded without the class-name check.
+        """
+        # Text is only decoded below for the node types that produce elements;
+        # decoding every node would copy each enclosing block's text again
         node_type = node.type
-        node_text = node.text.decode('utf8')
 
         # Handle class definitions for all languages
         if node_type in ('class_definition', 'class_declaration', 'class_specifier', 'struct_specifier'):
@@ -167,7 +249,8 @@ class RepoElementParser:
             if node_type in ('class_definition', 'class_declaration'):
                 for child in node.children:
                     if child.type == 'identifier':
-                        class_name = child.text.decode('utf8')
+                        class_name = self._node_name(child, source_code)
+                        class_names.add(class_name)
                         if not self._is_std_lib_identifier(class_name):
                             self.elements['classes'].add(class_name)
                             self.elements['identifiers'].add(class_name)
@@ -176,7 +259,8 @@ class RepoElementParser:
             elif node_type in ('class_specifier', 'struct_specifier'):
                 for child in node.children:
                     if child.type == 'type_identifier':
-                        class_name = child.text.decode('utf8')
+                        class_name = self._node_name(child, source_code)
+                        class_names.add(class_name)
                         if not self._is_std_lib_identifier(class_name):
                             self.elements['classes'].add(class_name)
                             self.elements['identifiers'].add(class_name)
@@ -184,36 +268,78 @@ class RepoElementParser:
 
         # Handle code elements
         if node_type == 'identifier':
-            name = node_text
+            name = self._node_name(node, source_code)
             if not self._is_std_lib_identifier(name):
                 if name not in ('__name__', '__main__', '__file__', 'this', 'super'):
                     self.elements['identifiers'].add(name)
-                if self._is_variable(node, class_names):
+                if self._is_variable(node, None, parent, grand_parent, name):
                     self.elements['variables'].add(name)
         elif node_type in ('string_literal', 'string'):
-            text = node_text.strip('"\'')
+            text = self._node_text(node, source_code).strip('"\'')
             if text:  # Only add non-empty strings
-                if self._is_docstring(node.parent):
+                if self._is_docstring(parent or node.parent, grand_parent, great_grand_parent, first_statements):
                     self.elements['docstrings'].append(text)
                 else:
                     self.elements['literals'].append(text)
         elif node_type in ('number_literal', 'integer', 'float'):
-            self.elements['literals'].append(node_text)
+            self.elements['literals'].append(self._node_text(node, source_code))
         elif node_type in ('comment', 'line_comment'):
-            text = node_text.lstrip('#').strip()
+            text = self._node_text(node, source_code).lstrip('#').strip()
             self.elements['comments'].append(text)
         elif node_type in ('function_definition', 'constructor_declaration', 'constructor_or_destructor_definition', 'method_definition'):
             for child in node.children:
                 if child.type == 'identifier':
-                    func_name = child.text.decode('utf8')
+                    func_name = self._node_name(child, source_code)
                     if not self._is_std_lib_identifier(func_name) and func_name != '__init__':
                         self.elements['functions'].add(func_name)
                         self.elements['identifiers'].add(func_name)
                     break
 
-        # Recursively process children
-        for child in node.children:
-            self._extract_elements(child, source_code, class_names)
+    def _extract_elements_with_query(self, query, node, source_code: bytes) -> None:
+        """Extract the elements below ``node`` from the captures of a queries/<language>.scm query.
+
+        Matching runs in tree-sitter; this only applies the same name filters
+        as _extract_node. Captures are put in document order (outer nodes
+        first), so literals, comments and docstrings come out in the same
+        order as the tree walk.
+        """
+        captures = query.captures(node)
+        captures.sort(key=lambda capture: (capture[0].start_byte, -capture[0].end_byte))
+        not_variables = {captured.id for captured, name in captures if name == 'not_variable'}
+        docstrings = {captured.id for captured, name in captures if name == 'docstring'}
+        class_names = set()
+
+        for captured, capture_name in captures:
+            if capture_name == 'identifier':
+                name = self._node_name(captured, source_code)
+                if not self._is_std_lib_identifier(name) and name not in ('__name__', '__main__', '__file__', 'this', 'super'):
+                    self.elements['identifiers'].add(name)
+                    if captured.id not in not_variables:
+                        self.elements['variables'].add(name)
+            elif capture_name == 'class.name':
+                class_name = self._node_name(captured, source_code)
+                class_names.add(class_name)
+                if not self._is_std_lib_identifier(class_name):
+                    self.elements['classes'].add(class_name)
+                    self.elements['identifiers'].add(class_name)
+            elif capture_name == 'function.name':
+                func_name = self._node_name(captured, source_code)
+                if not self._is_std_lib_identifier(func_name) and func_name != '__init__':
+                    self.elements['functions'].add(func_name)
+                    self.elements['identifiers'].add(func_name)
+            elif capture_name == 'string':
+                text = self._node_text(captured, source_code).strip('"\'')
+                if text:  # Only add non-empty strings
+                    if captured.id in docstrings:
+                        self.elements['docstrings'].append(text)
+                    else:
+                        self.elements['literals'].append(text)
+            elif capture_name == 'number':
+                self.elements['literals'].append(self._node_text(captured, source_code))
+            elif capture_name == 'comment':
+                self.elements['comments'].append(self._node_text(captured, source_code).lstrip('#').strip())
+
+        self.elements['variables'] -= class_names
 
     def parse_file(self, file_path: str) -> Dict[str, Any]:
         """Parse a single file and extract all code elements."""
@@ -229,12 +355,11 @@ class RepoElementParser:
             # Reset elements for new file
             self.elements = {k: set() if isinstance(v, set) else [] for k, v in self.elements.items()}
             
-            # First pass: collect all class names
-            class_names = set()
-            self._collect_class_names(tree.root_node, class_names)
-            
-            # Second pass: extract all elements, using class_names
-            self._extract_elements(tree.root_node, source_code, class_names)
+            if lang_name in self.query_languages:
+                self._extract_elements_with_query(get_element_query(lang_name), tree.root_node, source_code)
+            else:
+                # Extract all elements in one pass over the tree
+                self._extract_elements(tree.root_node, source_code)
             
             result = {
                 'identifiers': sorted(list(self.elements['identifiers'])),
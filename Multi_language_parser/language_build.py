@@ -2,27 +2,33 @@ from tree_sitter import Language, Parser
 import tree_sitter
 import os
 
+# Paths are relative to this directory, not the working directory, so the
+# parser can be imported and used from any directory or thread
+PARSER_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.path.join(PARSER_DIR, 'build')
+LIBRARY_PATH = os.path.join(BUILD_DIR, 'my-languages.so')
+
 # Make sure the build directory exists
-os.makedirs('build', exist_ok=True)
+os.makedirs(BUILD_DIR, exist_ok=True)
 # print(Language.)
 # # Build the languages
 Language.build_library(
-    'build/my-languages.so',
+    LIBRARY_PATH,
     [
-        './tree-sitter-c',
-        './tree-sitter-cpp',
-        './tree-sitter-python',
-        './tree-sitter-javascript',
-        './tree-sitter-java'
+        os.path.join(PARSER_DIR, 'tree-sitter-c'),
+        os.path.join(PARSER_DIR, 'tree-sitter-cpp'),
+        os.path.join(PARSER_DIR, 'tree-sitter-python'),
+        os.path.join(PARSER_DIR, 'tree-sitter-javascript'),
+        os.path.join(PARSER_DIR, 'tree-sitter-java')
     ]
 )
 
 # Load the languages
-CGRAMMAR = Language('build/my-languages.so', 'c')
-CPPGRAMMAR = Language('build/my-languages.so', 'cpp')
-PYTHONGRAMMAR = Language('build/my-languages.so', 'python')
-JAVASCRIPTGRAMMAR = Language('build/my-languages.so', 'javascript')
-JAVAGRAMMAR = Language('build/my-languages.so', 'java')
+CGRAMMAR = Language(LIBRARY_PATH, 'c')
+CPPGRAMMAR = Language(LIBRARY_PATH, 'cpp')
+PYTHONGRAMMAR = Language(LIBRARY_PATH, 'python')
+JAVASCRIPTGRAMMAR = Language(LIBRARY_PATH, 'javascript')
+JAVAGRAMMAR = Language(LIBRARY_PATH, 'java')
 
 # Create a parser
 PARSERS = {
@@ -44,3 +50,16 @@ def get_parser(file_extension):
         raise ValueError(f"Unsupported file extension: {file_extension}")
     
     
+# Element queries for RepoElementParser's query engine, one per language
+QUERY_DIR = os.path.join(PARSER_DIR, 'queries')
+_ELEMENT_QUERIES = {}
+
+def get_element_query(lang_name):
+    """Compiled queries/<lang_name>.scm for the language (cached)."""
+    if lang_name not in _ELEMENT_QUERIES:
+        languages = {name: lang_obj for lang_obj, name in PARSERS.values()}
+        if lang_name not in languages:
+            raise ValueError(f"Unsupported language: {lang_name}")
+        with open(os.path.join(QUERY_DIR, f'{lang_name}.scm'), encoding='utf-8') as f:
+            _ELEMENT_QUERIES[lang_name] = languages[lang_name].query(f.read())
+    return _ELEMENT_QUERIES[lang_name]
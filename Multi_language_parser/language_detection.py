@@ -1,46 +1,159 @@
 import json
 import re
-from collections import defaultdict
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+from itertools import repeat
 import matplotlib.pyplot as plt
 import os
 
-# Unicode script ranges
+from script_table import SCRIPT_NAMES, RANGE_STARTS, RANGE_SCRIPTS
+
+# Legacy block ranges, in priority order (the first matching script wins); they
+# take precedence over the Unicode script data inside these blocks
+SCRIPT_RANGES = [
+    ('CJK Unified Ideographs', [(0x4E00, 0x9FFF)]),
+    ('Japanese (Hiragana/Katakana/Kanji)', [(0x3040, 0x30FF), (0x4E00, 0x9FFF)]),
+    ('Hangul (Korean)', [(0xAC00, 0xD7AF)]),
+    ('Arabic', [(0x0600, 0x06FF)]),
+    ('Hebrew', [(0x0590, 0x05FF)]),
+    ('Devanagari (Hindi, etc.)', [(0x0900, 0x097F)]),
+    ('Tamil', [(0x0B80, 0x0BFF)]),
+    ('Thai', [(0x0E00, 0x0E7F)]),
+    ('Cyrillic', [(0x0400, 0x04FF)]),
+    ('Greek and Coptic', [(0x0370, 0x03FF)]),
+    ('Bengali', [(0x0980, 0x09FF)]),
+    ('Gujarati', [(0x0A80, 0x0AFF)]),
+]
+
 UNICODE_SCRIPTS = [
-    (re.compile(r'[\u4E00-\u9FFF]'), 'CJK Unified Ideographs'),
-    (re.compile(r'[\u3040-\u30FF\u4E00-\u9FFF]'), 'Japanese (Hiragana/Katakana/Kanji)'),
-    (re.compile(r'[\uAC00-\uD7AF]'), 'Hangul (Korean)'),
-    (re.compile(r'[\u0600-\u06FF]'), 'Arabic'),
-    (re.compile(r'[\u0590-\u05FF]'), 'Hebrew'),
-    (re.compile(r'[\u0900-\u097F]'), 'Devanagari (Hindi, etc.)'),
-    (re.compile(r'[\u0B80-\u0BFF]'), 'Tamil'),
-    (re.compile(r'[\u0E00-\u0E7F]'), 'Thai'),
-    (re.compile(r'[\u0400-\u04FF]'), 'Cyrillic'),
-    (re.compile(r'[\u0370-\u03FF]'), 'Greek and Coptic'),
-    (re.compile(r'[\u0980-\u09FF]'), 'Bengali'),
-    (re.compile(r'[\u0A80-\u0AFF]'), 'Gujarati'),
+    (re.compile('[' + ''.join(f'\\u{lo:04X}-\\u{hi:04X}' for lo, hi in ranges) + ']'), script)
+    for script, ranges in SCRIPT_RANGES
 ]
 
-# Helper to classify a string
-def classify_string(s):
+# Unicode script names (script_table.SCRIPT_NAMES) reported under one of the
+# labels above; every other script is reported under its own name
+UNICODE_SCRIPT_LABELS = {
+    'Han': 'CJK Unified Ideographs',
+    'Hiragana': 'Japanese (Hiragana/Katakana/Kanji)',
+    'Katakana': 'Japanese (Hiragana/Katakana/Kanji)',
+    'Hangul': 'Hangul (Korean)',
+    'Devanagari': 'Devanagari (Hindi, etc.)',
+    'Greek': 'Greek and Coptic',
+    'Coptic': 'Greek and Coptic',
+    'Latin': 'Latin Extended',
+    # Punctuation, symbols, combining marks and unassigned codepoints
+    'Common': 'Other Non-English',
+    'Inherited': 'Other Non-English',
+    'Unknown': 'Other Non-English',
+}
+
+# Codepoint -> script lookup: index 0 is uncounted ASCII, 1 is 'Other Non-English'
+SCRIPT_LABELS = list(dict.fromkeys(
+    [None, 'Other Non-English']
+    + [script for script, _ in SCRIPT_RANGES]
+    + [UNICODE_SCRIPT_LABELS.get(name, name) for name in SCRIPT_NAMES]
+))
+OTHER_SCRIPT_INDEX = 1
+
+# Label index of every run in script_table, for lookups outside the BMP
+RUN_LABEL_INDEX = bytes(
+    SCRIPT_LABELS.index(UNICODE_SCRIPT_LABELS.get(SCRIPT_NAMES[script], SCRIPT_NAMES[script]))
+    for script in RANGE_SCRIPTS
+)
+
+
+def _build_script_table():
+    """BMP codepoint -> label index, from the generated Unicode script runs."""
+    table = bytearray(0x10000)
+    for run, start in enumerate(RANGE_STARTS):
+        if start >= 0x10000:
+            break
+        end = RANGE_STARTS[run + 1] if run + 1 < len(RANGE_STARTS) else 0x10000
+        end = min(end, 0x10000)
+        table[start:end] = bytes([RUN_LABEL_INDEX[run]]) * (end - start)
+    # The legacy block ranges still win inside their blocks, so punctuation and
+    # marks there (Arabic comma, Devanagari danda, ...) keep their block's label.
+    # Fill lowest priority first so earlier scripts overwrite overlapping ranges
+    for index in range(len(SCRIPT_RANGES) - 1, -1, -1):
+        for lo, hi in SCRIPT_RANGES[index][1]:
+            table[lo:hi + 1] = bytes([index + 2]) * (hi - lo + 1)
+    table[:128] = bytes(128)
+    return table
+
+
+SCRIPT_TABLE = _build_script_table()
+
+
+def _astral_index(codepoint):
+    return RUN_LABEL_INDEX[bisect_right(RANGE_STARTS, codepoint) - 1]
+
+
+def script_of(char):
+    """Script label for one character (None for ASCII)."""
+    codepoint = ord(char)
+    if codepoint >= 0x10000:
+        return SCRIPT_LABELS[_astral_index(codepoint)]
+    return SCRIPT_LABELS[SCRIPT_TABLE[codepoint]]
+
+
+# Strings at least this long are counted per distinct character
+COUNTER_MIN_LENGTH = 32
+
+# Bounded memo of non-ASCII classifications; override per process with
+# CLASSIFY_CACHE_SIZE or configure_classify_cache() (0 disables it)
+DEFAULT_CLASSIFY_CACHE_SIZE = int(os.environ.get('CLASSIFY_CACHE_SIZE', 65536))
+
+
+def _classify_non_ascii(s):
+    """Return ``(script, confidence)`` for a non-empty, non-ASCII string."""
     total = len(s)
-    if total == 0:
-        return {'script': 'English/ASCII', 'confidence': 1.0}
-    script_counts = defaultdict(int)
-    for c in s:
-        found = False
-        for regex, script in UNICODE_SCRIPTS:
-            if regex.match(c):
-                script_counts[script] += 1
-                found = True
-                break
-        if not found and ord(c) > 127:
-            script_counts['Other Non-English'] += 1
-    if not script_counts:
-        return {'script': 'English/ASCII', 'confidence': 1.0}
+    # Counter keeps first-appearance order, so script_counts does too and max()
+    # breaks ties the same way as the per-character loop
+    chars = Counter(s).items() if total >= COUNTER_MIN_LENGTH else zip(s, repeat(1))
+    index_counts = {}
+    table = SCRIPT_TABLE
+    for c, count in chars:
+        codepoint = ord(c)
+        index = table[codepoint] if codepoint < 0x10000 else _astral_index(codepoint)
+        if index:
+            index_counts[index] = index_counts.get(index, 0) + count
+    script_counts = {SCRIPT_LABELS[index]: count for index, count in index_counts.items()}
     # Find the dominant script
     dominant_script = max(script_counts, key=script_counts.get)
     confidence = script_counts[dominant_script] / total
-    return {'script': dominant_script, 'confidence': round(confidence, 2)}
+    return dominant_script, round(confidence, 2)
+
+
+_classify_cached = _classify_non_ascii
+
+
+def configure_classify_cache(maxsize=DEFAULT_CLASSIFY_CACHE_SIZE):
+    """(Re)create this process's LRU memo of classifications, dropping old entries.
+
+    Each process has its own memo; pass this as a multiprocessing ``initializer``
+    to size it in worker processes. ``maxsize`` of 0 disables memoization.
+    """
+    global _classify_cached
+    _classify_cached = lru_cache(maxsize=maxsize)(_classify_non_ascii) if maxsize else _classify_non_ascii
+
+
+def classify_cache_info():
+    """Hits, misses and size of the memo (ASCII strings never reach it), or None if disabled."""
+    cache_info = getattr(_classify_cached, 'cache_info', None)
+    return cache_info() if cache_info else None
+
+
+configure_classify_cache()
+
+
+# Helper to classify a string
+def classify_string(s):
+    if not s or s.isascii():
+        return {'script': 'English/ASCII', 'confidence': 1.0}
+    script, confidence = _classify_cached(s)
+    # A fresh dict every call, so callers may modify the result
+    return {'script': script, 'confidence': confidence}
 
 def create_pie_chart(data, title, output_path):
     """Create a pie chart from the given data and save it."""
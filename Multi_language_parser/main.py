@@ -4,7 +4,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 from collections import defaultdict
 from File_parser import RepoElementParser
-from language_detection import classify_string
+from language_detection import classify_string, classify_cache_info
 import subprocess
 
 def setup_directories(repo_name: str, repo_number: int) -> tuple:
@@ -303,6 +303,11 @@ def analyze_repository(repo_url: str, repo_number: int) -> dict:
             "english_characters": flatten_by_category_for_json(english_elements)
         }
         
+        cache_info = classify_cache_info()
+        if cache_info:
+            print(f"Script classification cache: {cache_info.hits} hits, {cache_info.misses} misses, "
+                  f"{cache_info.currsize}/{cache_info.maxsize} entries")
+        
         # Save structured output
         output_file = os.path.join(directories['json'], 'analysis.json')
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -0,0 +1,14 @@
+; Element captures for RepoElementParser's query engine (C).
+; The std-lib and special-name filters are applied to the captures in File_parser.
+
+(identifier) @identifier
+
+(struct_specifier (type_identifier) @class.name)
+(function_definition (identifier) @function.name)
+
+; Identifiers that are never variables
+(function_definition (identifier) @not_variable)
+
+(string_literal) @string
+(number_literal) @number
+(comment) @comment
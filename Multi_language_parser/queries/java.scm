@@ -0,0 +1,13 @@
+; Element captures for RepoElementParser's query engine (Java).
+; The std-lib and special-name filters are applied to the captures in File_parser.
+
+(identifier) @identifier
+
+(class_declaration (identifier) @class.name)
+(constructor_declaration (identifier) @function.name)
+
+; Identifiers that are never variables
+(constructor_declaration (identifier) @not_variable)
+
+(string_literal) @string
+(line_comment) @comment
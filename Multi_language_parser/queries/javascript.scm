@@ -0,0 +1,13 @@
+; Element captures for RepoElementParser's query engine (JavaScript).
+; The std-lib and special-name filters are applied to the captures in File_parser.
+
+(identifier) @identifier
+
+(class_declaration (identifier) @class.name)
+
+; Method names are property_identifiers and import names sit below
+; import_clause, so _is_variable's method_definition and import_statement
+; rules (and the function names from method_definition) never apply
+
+(string) @string
+(comment) @comment
@@ -0,0 +1,24 @@
+; Element captures for RepoElementParser's query engine (Python).
+; The std-lib and special-name filters are applied to the captures in File_parser.
+
+(identifier) @identifier
+
+(class_definition (identifier) @class.name)
+(function_definition (identifier) @function.name)
+
+; Identifiers that are never variables
+(function_definition (identifier) @not_variable)
+(class_definition (identifier) @not_variable)
+(call (identifier) @not_variable)
+; _is_variable's import-statement and class-block rules have no pattern here:
+; the grammar never puts an identifier directly under those nodes
+
+(string) @string
+(integer) @number
+(float) @number
+(comment) @comment
+
+; The first statement of a module, class or function, if it is a bare string
+(module . (comment)* . (expression_statement (string) @docstring))
+(class_definition (block . (comment)* . (expression_statement (string) @docstring)))
+(function_definition (block . (comment)* . (expression_statement (string) @docstring)))
@@ -0,0 +1,133 @@
+"""
+Generate script_table.py, the packed Unicode script range table used by
+language_detection.py.
+
+Input is the Unicode Character Database Scripts.txt
+(https://www.unicode.org/Public/UCD/latest/ucd/Scripts.txt) or, with --perl,
+the same data read from the local Perl's Unicode::UCD module. The output is a
+sorted array of run start codepoints covering 0..0x10FFFF with one script
+index per run, so a lookup is a single bisect.
+
+Usage:
+    python script_table_build.py --scripts-txt Scripts.txt
+    python script_table_build.py --perl
+"""
+
+import argparse
+import re
+import subprocess
+
+MAX_CODEPOINT = 0x10FFFF
+UNKNOWN_SCRIPT = 'Unknown'
+
+SCRIPTS_LINE = re.compile(r'^([0-9A-Fa-f]+)(?:\.\.([0-9A-Fa-f]+))?\s*;\s*([A-Za-z_]+)')
+VERSION_LINE = re.compile(r'^#\s*Scripts-(\d+\.\d+\.\d+)\.txt')
+
+PERL_DUMP = (
+    'use Unicode::UCD qw(charscripts); my $s = charscripts(); '
+    'print "# Scripts-", Unicode::UCD::UnicodeVersion(), ".txt\\n"; '
+    'for my $k (sort keys %$s) { for my $r (@{$s->{$k}}) { printf "%04X..%04X ; %s\\n", $r->[0], $r->[1], $k } }'
+)
+
+
+def display_name(name):
+    """'Old_Italic' / 'Old_italic' -> 'Old Italic' (Scripts.txt and Perl spell some names differently)."""
+    return ' '.join(word[:1].upper() + word[1:] for word in name.split('_'))
+
+
+def parse_scripts(lines):
+    """Return ``(version, [(start, end, script), ...])`` from Scripts.txt-format lines."""
+    version = None
+    ranges = []
+    for line in lines:
+        match = VERSION_LINE.match(line)
+        if match:
+            version = match.group(1)
+            continue
+        match = SCRIPTS_LINE.match(line)
+        if match:
+            start = int(match.group(1), 16)
+            end = int(match.group(2) or match.group(1), 16)
+            ranges.append((start, end, display_name(match.group(3))))
+    return version, sorted(ranges)
+
+
+def build_runs(ranges):
+    """Merge ranges into contiguous runs covering every codepoint; gaps are Unknown."""
+    runs = []
+    position = 0
+    for start, end, script in ranges:
+        if start > position:
+            runs.append((position, UNKNOWN_SCRIPT))
+        if not runs or runs[-1][1] != script:
+            runs.append((start, script))
+        position = end + 1
+    if position <= MAX_CODEPOINT:
+        runs.append((position, UNKNOWN_SCRIPT))
+    # Adjacent gaps/ranges can still repeat a script after gap filling
+    merged = []
+    for start, script in runs:
+        if not merged or merged[-1][1] != script:
+            merged.append((start, script))
+    return merged
+
+
+def render_module(version, runs):
+    names = [UNKNOWN_SCRIPT] + sorted({script for _, script in runs} - {UNKNOWN_SCRIPT})
+    index = {name: i for i, name in enumerate(names)}
+    starts = [start for start, _ in runs]
+    scripts = [index[script] for _, script in runs]
+
+    def rows(values, fmt, per_line):
+        return '\n'.join(
+            '    ' + ', '.join(fmt.format(v) for v in values[i:i + per_line]) + ','
+            for i in range(0, len(values), per_line)
+        )
+
+    return (
+        f'# Generated by script_table_build.py from Unicode {version} Scripts data. Do not edit.\n'
+        '"""Unicode script of every codepoint as packed runs: RANGE_STARTS[i] begins a run of\n'
+        'SCRIPT_NAMES[RANGE_SCRIPTS[i]] that lasts until RANGE_STARTS[i + 1]."""\n'
+        '\n'
+        'from array import array\n'
+        '\n'
+        f'UNICODE_VERSION = {version!r}\n'
+        '\n'
+        'SCRIPT_NAMES = (\n'
+        + rows(names, '{!r}', 6) + '\n'
+        ')\n'
+        '\n'
+        "RANGE_STARTS = array('I', [\n"
+        + rows(starts, '0x{:04X}', 10) + '\n'
+        '])\n'
+        '\n'
+        'RANGE_SCRIPTS = bytes([\n'
+        + rows(scripts, '{}', 20) + '\n'
+        '])\n'
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = arg_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--scripts-txt', help='path to the UCD Scripts.txt')
+    source.add_argument('--perl', action='store_true', help="read the data from Perl's Unicode::UCD")
+    arg_parser.add_argument('--output', default='script_table.py')
+    args = arg_parser.parse_args()
+
+    if args.perl:
+        lines = subprocess.run(['perl', '-e', PERL_DUMP], check=True, capture_output=True, text=True).stdout.splitlines()
+    else:
+        with open(args.scripts_txt, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    version, ranges = parse_scripts(lines)
+    runs = build_runs(ranges)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(render_module(version or 'unknown', runs))
+    print(f"Wrote {len(runs)} runs over {len({script for _, script in runs})} scripts "
+          f"(Unicode {version}) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,15 @@
 import asyncio
+import functools
 import inspect
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
-from googletrans import Translator
+from translation_backends import TranslationBackend, create_translator
+from translation_cache import TranslationCache, DEFAULT_CACHE_PATH
+from translation_retry import TranslationRetry
 
 
 TARGET_LANG_CODES: List[str] = [
@@ -51,6 +55,9 @@ LANG_CODE_TO_NAME: Dict[str, str] = {
 }
 
 
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30.0
+
 SENTENCE_PUNCT = re.compile(r'([.!?])(?!\s|$)')
 
 
@@ -59,31 +66,309 @@ def normalize_text(text: str) -> str:
     return re.sub(r'\s{2,}', ' ', text).strip()
 
 
-async def translate_prompt(prompt_text: str, language_codes: List[str]) -> Dict[str, Optional[str]]:
-    translator = Translator(service_urls=["translate.googleapis.com"])
-    translations: Dict[str, Optional[str]] = {}
+async def _translate_one(translator: TranslationBackend, text: str, code: str, timeout: Optional[float],
+                         executor: ThreadPoolExecutor, retry: TranslationRetry) -> str:
+    def call():
+        # Backends are synchronous: run them in worker threads so calls overlap
+        if inspect.iscoroutinefunction(translator.translate):
+            return translator.translate(text, code)
+        return asyncio.get_running_loop().run_in_executor(executor, functools.partial(translator.translate, text, code))
 
-    for code in language_codes:
-        try:
-            if code == "en":
-                translations[code] = prompt_text
-                lang_name = LANG_CODE_TO_NAME.get(code, code)
-                print(f"{code} ({lang_name}): {translations[code]}")
-                continue
-
-            result = translator.translate(prompt_text, dest=code)
-            if inspect.isawaitable(result):
-                result = await result
-            translations[code] = result.text
+    return await retry.run(call, translator.name, code, [text], timeout)
+
+
+async def translate_prompt(
+    prompt_text: str,
+    language_codes: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+    cache: Optional[TranslationCache] = None,
+    translator: Optional[TranslationBackend] = None,
+    retry: Optional[TranslationRetry] = None,
+) -> Dict[str, Optional[str]]:
+    """Translate one prompt into every language concurrently.
+
+    At most ``concurrency`` requests are in flight (or as many as ``semaphore``
+    allows when one is shared across prompts), and each request is abandoned
+    after ``timeout`` seconds. Failed requests are retried with backoff
+    (see ``translation_retry``); languages that still fail map to ``None``.
+    With a ``cache``, cached languages are not sent to the translator and
+    successful translations are written through. ``translator`` defaults to
+    googletrans.
+    """
+    own_translator = translator is None
+    if own_translator:
+        translator = create_translator("googletrans")
+    if not translator.cacheable:
+        cache = None
+    retry = retry or TranslationRetry()
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def run(code: str) -> Optional[str]:
+        if code == "en":
+            return prompt_text
+        if cache is not None:
+            cached = cache.get(prompt_text, code)
+            if cached is not None:
+                return cached
+        async with semaphore:
+            try:
+                text = await _translate_one(translator, prompt_text, code, timeout, executor, retry)
+                if cache is not None:
+                    cache.put(prompt_text, code, text)
+                return text
+            except Exception as exc:
+                print(f"Error translating to {code}: {exc}")
+            return None
+
+    try:
+        results = await asyncio.gather(*(run(code) for code in language_codes))
+    finally:
+        if own_executor:
+            # Don't block on requests that already timed out
+            executor.shutdown(wait=False)
+        if own_translator:
+            translator.close()
+    translations: Dict[str, Optional[str]] = dict(zip(language_codes, results))
+
+    for code, text in translations.items():
+        if text is not None:
             lang_name = LANG_CODE_TO_NAME.get(code, code)
-            print(f"{code} ({lang_name}): {translations[code]}")
-        except Exception as exc:
-            print(f"Error translating to {code}: {exc}")
-            translations[code] = None
+            print(f"{code} ({lang_name}): {text}")
 
     return translations
 
 
+def pack_batches(texts: List[str], max_chars: Optional[int]) -> List[List[str]]:
+    """Greedily pack texts, in order, into batches of at most ``max_chars`` characters.
+
+    A text longer than the budget gets a batch of its own; ``max_chars`` of
+    None puts everything in one batch.
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_chars = 0
+    for text in texts:
+        if current and max_chars is not None and current_chars + len(text) > max_chars:
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(text)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _translate_batch(translator: TranslationBackend, texts: List[str], code: str, timeout: Optional[float],
+                           executor: ThreadPoolExecutor, retry: TranslationRetry) -> List[Optional[str]]:
+    def call():
+        return asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(translator.translate_batch, texts, code)
+        )
+
+    return await retry.run(call, translator.name, code, texts, timeout)
+
+
+async def translate_prompts_batched(
+    prompts: Dict[str, str],
+    language_codes: List[str],
+    translator: TranslationBackend,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    cache: Optional[TranslationCache] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+    retry: Optional[TranslationRetry] = None,
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """Translate many prompts with as few requests as possible.
+
+    For each target language, the distinct texts that are not cached are
+    packed into batches under ``translator.max_batch_chars`` and each batch
+    is one ``translate_batch`` call; results are mapped back to prompt ids.
+    Batches for all languages run concurrently under one ``concurrency``
+    limit, each attempt with its own ``timeout``, and failed batches are
+    retried with backoff. Texts a batch call leaves untranslated are sent
+    again one at a time; texts that still fail map to ``None``.
+    """
+    if not translator.cacheable:
+        cache = None
+    retry = retry or TranslationRetry()
+    semaphore = asyncio.Semaphore(concurrency)
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    # Identical prompts are translated once
+    unique_texts = list(dict.fromkeys(prompts.values()))
+    translated: Dict[str, Dict[str, Optional[str]]] = {code: {} for code in language_codes}
+    jobs = []
+    for code in language_codes:
+        if code == "en":
+            translated[code] = {text: text for text in unique_texts}
+            continue
+        pending = []
+        for text in unique_texts:
+            cached = cache.get(text, code) if cache is not None else None
+            if cached is None:
+                pending.append(text)
+            else:
+                translated[code][text] = cached
+        jobs.extend((code, batch) for batch in pack_batches(pending, translator.max_batch_chars))
+
+    single_requests = 0
+
+    async def run_one(code: str, text: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                return await _translate_one(translator, text, code, timeout, executor, retry)
+            except Exception as exc:
+                print(f"Error translating to {code}: {exc}")
+                return None
+
+    async def run(code: str, batch: List[str]) -> None:
+        nonlocal single_requests
+        untranslated: List[int] = []
+        async with semaphore:
+            try:
+                results = list(await _translate_batch(translator, batch, code, timeout, executor, retry))
+                untranslated = [i for i, result in enumerate(results) if result is None]
+            except Exception as exc:
+                print(f"Error translating {len(batch)} prompts to {code}: {exc}")
+                results = [None] * len(batch)
+        # Texts the batch call answered without a translation (e.g. the service
+        # merged lines) get a request, timeout and retries of their own
+        single_requests += len(untranslated)
+        singles = await asyncio.gather(*(run_one(code, batch[i]) for i in untranslated))
+        for i, result in zip(untranslated, singles):
+            results[i] = result
+        for text, result in zip(batch, results):
+            translated[code][text] = result
+            if cache is not None:
+                cache.put(text, code, result)
+
+    try:
+        await asyncio.gather(*(run(code, batch) for code, batch in jobs))
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
+
+    print(f"Translated {len(prompts)} prompts ({len(unique_texts)} distinct) into {len(language_codes)} languages "
+          f"with {len(jobs) + single_requests} {translator.name} requests")
+    return {
+        pid: {code: translated[code].get(text) for code in language_codes}
+        for pid, text in prompts.items()
+    }
+
+
+async def translate_prompts(
+    prompts: Dict[str, str],
+    language_codes: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    cache: Optional[TranslationCache] = None,
+    translator: Optional[TranslationBackend] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+    retry: Optional[TranslationRetry] = None,
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """Translate many prompts (prompt id -> text) in one concurrent pass.
+
+    All prompts share one concurrency limit, so ``concurrency`` bounds the
+    total number of requests in flight. Backends that support batching get
+    prompts packed per language (see ``translate_prompts_batched``); others
+    get one request per prompt and language. Returns prompt id -> translations.
+    """
+    own_translator = translator is None
+    if own_translator:
+        translator = create_translator("googletrans")
+    # One breaker for every request to this translator
+    retry = retry or TranslationRetry()
+    semaphore = asyncio.Semaphore(concurrency)
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+    prompt_ids = list(prompts)
+    try:
+        if translator.supports_batch:
+            return await translate_prompts_batched(
+                prompts, language_codes, translator, concurrency=concurrency, timeout=timeout,
+                cache=cache, executor=executor, retry=retry,
+            )
+        results = await asyncio.gather(*(
+            translate_prompt(prompts[pid], language_codes, timeout=timeout, semaphore=semaphore,
+                             executor=executor, cache=cache, translator=translator, retry=retry)
+            for pid in prompt_ids
+        ))
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
+        if own_translator:
+            translator.close()
+    return dict(zip(prompt_ids, results))
+
+
+class TranslationSession:
+    """One translator, worker pool and event loop shared by every translation in a run.
+
+    The translator (and its pooled keep-alive HTTP connections) is created
+    once instead of per prompt, and all translation coroutines run on the
+    session's own long-lived event loop. The session's ``retry`` (and with it
+    the translator's circuit breaker) is shared by every call. ``close``
+    releases the worker pool, the translator, the cache and the loop; the
+    session is also a context manager.
+    """
+
+    def __init__(
+        self,
+        translator: Optional[TranslationBackend] = None,
+        language_codes: Optional[List[str]] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        cache: Optional[TranslationCache] = None,
+        retry: Optional[TranslationRetry] = None,
+    ):
+        self.translator = translator or create_translator("googletrans")
+        self.language_codes = language_codes or TARGET_LANG_CODES
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.cache = cache if self.translator.cacheable else None
+        self.retry = retry or TranslationRetry()
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def translate(self, prompt_text: str) -> Dict[str, Optional[str]]:
+        return self.loop.run_until_complete(translate_prompt(
+            prompt_text, self.language_codes, concurrency=self.concurrency, timeout=self.timeout,
+            executor=self.executor, cache=self.cache, translator=self.translator, retry=self.retry,
+        ))
+
+    def translate_many(self, prompts: Dict[str, str],
+                       language_codes: Optional[List[str]] = None) -> Dict[str, Dict[str, Optional[str]]]:
+        return self.loop.run_until_complete(translate_prompts(
+            prompts, language_codes or self.language_codes, concurrency=self.concurrency, timeout=self.timeout,
+            cache=self.cache, translator=self.translator, executor=self.executor, retry=self.retry,
+        ))
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        # Don't block on requests that already timed out
+        self.executor.shutdown(wait=False)
+        self.translator.close()
+        if self.cache is not None:
+            self.cache.close()
+        self.loop.close()
+
+    def __enter__(self) -> "TranslationSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 def write_translations_to_json(translations: Dict[str, Optional[str]], out_path: str) -> None:
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     with open(out_path, "w", encoding="utf-8") as f:
@@ -94,7 +379,8 @@ def main() -> None:
     prompt_text = input("Enter the prompt to translate: ").strip()
     prompt_text = normalize_text(prompt_text)
 
-    translations = asyncio.run(translate_prompt(prompt_text, TARGET_LANG_CODES))
+    with TranslationSession(cache=TranslationCache(DEFAULT_CACHE_PATH)) as session:
+        translations = session.translate(prompt_text)
     out_file = os.path.join("data", "translated_prompts.json")
     write_translations_to_json(translations, out_file)
 
@@ -0,0 +1,229 @@
+"""
+Frozen copy of the element extraction in Multi_language_parser/File_parser.py
+as of the baseline commit (738df6b), before any of the traversal optimizations.
+
+The benchmarks use it as the reference that optimized engines must match, so
+it must not share code with the current RepoElementParser. Do not edit it to
+follow later changes to File_parser.py; only the repository cloning/analysis
+methods and main() were left out.
+"""
+
+import os
+from typing import Dict, Any
+
+from language_build import get_parser
+
+
+class BaselineElementParser:
+    def __init__(self):
+        self.supported_extensions = {'.py', '.java', '.cpp', '.c', '.js'}  # Add more as needed
+        
+        # Standard library identifiers to exclude
+        self.std_lib_identifiers = {
+            'cout', 'endl', 'cin', 'cerr', 'clog',
+            'string', 'vector', 'map', 'set', 'list',
+            'make_unique', 'make_shared', 'unique_ptr', 'shared_ptr',
+            'cout', 'endl', 'cin', 'cerr', 'clog',
+            'printf', 'scanf', 'malloc', 'free', 'NULL',
+            'stdout', 'stdin', 'stderr',
+            'print', 'input', 'range', 'len', 'str', 'int', 'float',
+            'list', 'dict', 'set', 'tuple',
+            'console', 'document', 'window', 'require', 'module',
+            'exports', 'import', 'from', 'as'
+        }
+        
+        self.elements = {
+            'identifiers': set(),
+            'literals': [],
+            'variables': set(),
+            'comments': [],
+            'docstrings': [],
+            'functions': set(),
+            'classes': set()
+        }
+
+    def _is_docstring(self, node) -> bool:
+        """Determine if a string node is a docstring."""
+        if node.type != 'expression_statement':
+            return False
+            
+        parent = node.parent
+        if not parent:
+            return False
+            
+        if parent.type == 'module':
+            for child in parent.children:
+                if child.type not in ('comment', 'line_comment'):
+                    return child == node
+        elif parent.type == 'block':
+            grand_parent = parent.parent
+            if not grand_parent or grand_parent.type not in ('class_definition', 'function_definition'):
+                return False
+            for child in parent.children:
+                if child.type not in ('comment', 'line_comment'):
+                    return child == node
+                    
+        return False
+
+    def _is_std_lib_identifier(self, name: str) -> bool:
+        """Check if an identifier is from the standard library."""
+        return name in self.std_lib_identifiers
+
+    def _collect_class_names(self, node, class_names):
+        """First pass: Collect all class names in the AST."""
+        # Handle different language-specific class definitions
+        if node.type in ('class_definition', 'class_declaration', 'class_specifier', 'struct_specifier'):
+            # For Python, Java, JavaScript classes
+            if node.type in ('class_definition', 'class_declaration'):
+                for child in node.children:
+                    if child.type == 'identifier':
+                        class_name = child.text.decode('utf8')
+                        class_names.add(class_name)
+                        break
+            # For C++ classes and C structs
+            elif node.type in ('class_specifier', 'struct_specifier'):
+                for child in node.children:
+                    if child.type == 'type_identifier':
+                        class_name = child.text.decode('utf8')
+                        class_names.add(class_name)
+                        break
+        
+        for child in node.children:
+            self._collect_class_names(child, class_names)
+
+    def _is_variable(self, node, class_names=None) -> bool:
+        """Determine if an identifier node represents a variable."""
+        if node.type != 'identifier':
+            return False
+        name = node.text.decode('utf8')
+        if self._is_std_lib_identifier(name):
+            return False
+        if class_names and name in class_names:
+            return False
+        if node.parent and node.parent.type in ('function_definition', 'class_definition', 'constructor_declaration', 'constructor_or_destructor_definition'):
+            return False
+        if node.parent and node.parent.type == 'call':
+            return False
+        if node.parent and node.parent.type in ('import_statement', 'import_from_statement'):
+            return False
+        if name in ('__name__', '__main__', '__file__', 'this', 'super'):
+            return False
+        if node.parent and node.parent.type == 'method_definition':
+            return False
+        if node.parent and node.parent.type == 'function_definition':
+            return False
+        if node.parent and node.parent.type == 'class_definition':
+            return False
+        if node.parent and node.parent.parent and node.parent.parent.type == 'class_definition':
+            if node.parent.type == 'block' and any(child.type == 'method_definition' for child in node.parent.children):
+                return False
+        if node.parent and node.parent.parent and node.parent.parent.type == 'function_definition':
+            if node.parent.type == 'block' and any(child.type == 'method_definition' for child in node.parent.children):
+                return False
+        if node.parent and node.parent.parent and node.parent.parent.type == 'class_definition':
+            if node.parent.type == 'block' and any(child.type == 'function_definition' for child in node.parent.children):
+                return False
+        return True
+
+    def _extract_elements(self, node, source_code: bytes, class_names=None) -> None:
+        node_type = node.type
+        node_text = node.text.decode('utf8')
+
+        # Handle class definitions for all languages
+        if node_type in ('class_definition', 'class_declaration', 'class_specifier', 'struct_specifier'):
+            # For Python, Java, JavaScript classes
+            if node_type in ('class_definition', 'class_declaration'):
+                for child in node.children:
+                    if child.type == 'identifier':
+                        class_name = child.text.decode('utf8')
+                        if not self._is_std_lib_identifier(class_name):
+                            self.elements['classes'].add(class_name)
+                            self.elements['identifiers'].add(class_name)
+                        break
+            # For C++ classes and C structs
+            elif node_type in ('class_specifier', 'struct_specifier'):
+                for child in node.children:
+                    if child.type == 'type_identifier':
+                        class_name = child.text.decode('utf8')
+                        if not self._is_std_lib_identifier(class_name):
+                            self.elements['classes'].add(class_name)
+                            self.elements['identifiers'].add(class_name)
+                        break
+
+        # Handle code elements
+        if node_type == 'identifier':
+            name = node_text
+            if not self._is_std_lib_identifier(name):
+                if name not in ('__name__', '__main__', '__file__', 'this', 'super'):
+                    self.elements['identifiers'].add(name)
+                if self._is_variable(node, class_names):
+                    self.elements['variables'].add(name)
+        elif node_type in ('string_literal', 'string'):
+            text = node_text.strip('"\'')
+            if text:  # Only add non-empty strings
+                if self._is_docstring(node.parent):
+                    self.elements['docstrings'].append(text)
+                else:
+                    self.elements['literals'].append(text)
+        elif node_type in ('number_literal', 'integer', 'float'):
+            self.elements['literals'].append(node_text)
+        elif node_type in ('comment', 'line_comment'):
+            text = node_text.lstrip('#').strip()
+            self.elements['comments'].append(text)
+        elif node_type in ('function_definition', 'constructor_declaration', 'constructor_or_destructor_definition', 'method_definition'):
+            for child in node.children:
+                if child.type == 'identifier':
+                    func_name = child.text.decode('utf8')
+                    if not self._is_std_lib_identifier(func_name) and func_name != '__init__':
+                        self.elements['functions'].add(func_name)
+                        self.elements['identifiers'].add(func_name)
+                    break
+
+        # Recursively process children
+        for child in node.children:
+            self._extract_elements(child, source_code, class_names)
+
+    def parse_file(self, file_path: str) -> Dict[str, Any]:
+        """Parse a single file and extract all code elements."""
+        try:
+            ext = os.path.splitext(file_path)[1]
+            parser, lang_name = get_parser(ext)
+            
+            with open(file_path, 'rb') as f:
+                source_code = f.read()
+            
+            tree = parser.parse(source_code)
+            
+            # Reset elements for new file
+            self.elements = {k: set() if isinstance(v, set) else [] for k, v in self.elements.items()}
+            
+            # First pass: collect all class names
+            class_names = set()
+            self._collect_class_names(tree.root_node, class_names)
+            
+            # Second pass: extract all elements, using class_names
+            self._extract_elements(tree.root_node, source_code, class_names)
+            
+            result = {
+                'identifiers': sorted(list(self.elements['identifiers'])),
+                'literals': self.elements['literals'],
+                'variables': sorted(list(self.elements['variables'])),
+                'comments': self.elements['comments'],
+                'docstrings': self.elements['docstrings'],
+                'functions': sorted(list(self.elements['functions'])),
+                'classes': sorted(list(self.elements['classes']))
+            }
+            
+            return {
+                'success': True,
+                'language': lang_name,
+                'file_path': file_path,
+                'elements': result
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'file_path': file_path,
+                'error': str(e)
+            }
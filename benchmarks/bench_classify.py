@@ -0,0 +1,136 @@
+"""
+Micro-benchmark for Multi_language_parser.language_detection.classify_string.
+
+Builds a corpus shaped like parsed repository elements (mostly ASCII
+identifiers and strings, plus comments and literals in the scripts the
+pipeline targets), checks the table-driven classifier against a plain
+per-character count over script_of, reports how many strings the Unicode
+script data labels differently from the original regex loop, and reports
+strings per second with and without the LRU memo (which starts cold).
+
+Usage:
+    python benchmarks/bench_classify.py
+    python benchmarks/bench_classify.py --size 1000000 --legacy-sample 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Multi_language_parser")))
+
+from language_detection import (  # noqa: E402
+    UNICODE_SCRIPTS, DEFAULT_CLASSIFY_CACHE_SIZE, classify_cache_info, classify_string, configure_classify_cache,
+    script_of,
+)
+
+
+def reference_classify_string(s):
+    """classify_string written as the obvious per-character loop (correctness reference)."""
+    script_counts = {}
+    for c in s:
+        script = script_of(c)
+        if script is not None:
+            script_counts[script] = script_counts.get(script, 0) + 1
+    if not script_counts:
+        return {'script': 'English/ASCII', 'confidence': 1.0}
+    dominant_script = max(script_counts, key=script_counts.get)
+    return {'script': dominant_script, 'confidence': round(script_counts[dominant_script] / len(s), 2)}
+
+
+def legacy_classify_string(s):
+    """The per-character regex loop over the legacy block ranges (speed baseline)."""
+    total = len(s)
+    if total == 0:
+        return {'script': 'English/ASCII', 'confidence': 1.0}
+    script_counts = defaultdict(int)
+    for c in s:
+        found = False
+        for regex, script in UNICODE_SCRIPTS:
+            if regex.match(c):
+                script_counts[script] += 1
+                found = True
+                break
+        if not found and ord(c) > 127:
+            script_counts['Other Non-English'] += 1
+    if not script_counts:
+        return {'script': 'English/ASCII', 'confidence': 1.0}
+    dominant_script = max(script_counts, key=script_counts.get)
+    confidence = script_counts[dominant_script] / total
+    return {'script': dominant_script, 'confidence': round(confidence, 2)}
+
+
+ASCII_SAMPLES = [
+    "calculate_total", "user_id", "MAX_RETRIES", "self", "items", "process_data",
+    "Returns the sum of a and b", "# TODO: handle empty input", "HTTPClient", "i",
+]
+
+NON_ASCII_SAMPLES = [
+    "计算总和", "合計を計算する", "ユーザー名", "사용자 이름", "حساب المجموع", "סכום",
+    "योग की गणना करें", "மொத்தம்", "ผลรวม", "вычислить сумму", "υπολογισμός",
+    "মোট গণনা", "કુલ ગણતરી", "calcular_la_función", "tính tổng", "మొత్తం లెక్కించు",
+    "Ƙididdige jimla", "toplamı hesapla", "emoji 🚀 rocket", "mixed 名前 name",
+]
+
+
+def build_corpus(size, rng, non_ascii_ratio):
+    corpus = []
+    for _ in range(size):
+        if rng.random() < non_ascii_ratio:
+            text = rng.choice(NON_ASCII_SAMPLES)
+            if rng.random() < 0.5:
+                text = f"{rng.choice(ASCII_SAMPLES)} {text}"
+        else:
+            text = rng.choice(ASCII_SAMPLES)
+        if rng.random() < 0.3:
+            # Make a share of the strings unique, as identifiers usually are
+            text = f"{text}_{rng.randrange(100000)}"
+        corpus.append(text)
+    return corpus
+
+
+def time_classifier(func, corpus):
+    start = time.perf_counter()
+    for text in corpus:
+        func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--size", type=int, default=1_000_000)
+    arg_parser.add_argument("--legacy-sample", type=int, default=100_000,
+                            help="strings checked and timed with the slow legacy classifier")
+    arg_parser.add_argument("--non-ascii-ratio", type=float, default=0.2)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = build_corpus(args.size, rng, args.non_ascii_ratio)
+    sample = corpus[:args.legacy_sample]
+
+    mismatches = sum(1 for text in sample if classify_string(text) != reference_classify_string(text))
+    relabelled = sum(1 for text in sample if classify_string(text) != legacy_classify_string(text))
+    print(f"Corpus: {len(corpus):,} strings; mismatches vs reference on {len(sample):,}: {mismatches}; "
+          f"relabelled vs legacy ranges: {relabelled}")
+
+    legacy_s = time_classifier(legacy_classify_string, sample)
+    configure_classify_cache(0)
+    table_sample_s = time_classifier(classify_string, sample)
+    table_s = time_classifier(classify_string, corpus)
+    configure_classify_cache(DEFAULT_CLASSIFY_CACHE_SIZE)
+    cached_s = time_classifier(classify_string, corpus)
+    print(f"legacy : {len(sample) / legacy_s:>12,.0f} strings/s")
+    print(f"table  : {len(sample) / table_sample_s:>12,.0f} strings/s  ({legacy_s / table_sample_s:.1f}x)")
+    print(f"table  : {len(corpus) / table_s:>12,.0f} strings/s over the full corpus ({table_s:.2f}s)")
+    print(f"memo   : {len(corpus) / cached_s:>12,.0f} strings/s over the full corpus ({cached_s:.2f}s), "
+          f"{classify_cache_info()}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark for docstring detection in Multi_language_parser.File_parser on a
+module with many top-level strings.
+
+Writes a synthetic Python file with a module docstring followed by N bare
+top-level string constants (with comments and a few documented functions mixed
+in) and times parse_file with:
+
+    scan   the original _is_docstring, which looks up the string's module
+           or block with Node.parent and lists all of its children for every
+           string node (O(n^2) in top-level statements)
+    walk   the current walk, which looks up each module's or block's first
+           statement once per tree
+    query  the queries/python.scm captures
+
+The quadratic version is only run on a smaller file (--scan-strings); all
+engines must agree on it.
+
+Usage:
+    python benchmarks/bench_docstrings.py
+    python benchmarks/bench_docstrings.py --strings 50000 --scan-strings 5000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PARSER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Multi_language_parser"))
+sys.path.insert(0, PARSER_DIR)
+
+from File_parser import RepoElementParser  # noqa: E402
+
+
+class ScanningElementParser(RepoElementParser):
+    """The original _is_docstring: a fresh Node.parent and its full children list per string (reference only)."""
+
+    def _is_docstring(self, node, parent=None, grand_parent=None, first_statements=None):
+        if node.type != 'expression_statement':
+            return False
+        parent = node.parent
+        if not parent:
+            return False
+        if parent.type == 'module':
+            for child in parent.children:
+                if child.type not in ('comment', 'line_comment'):
+                    return child == node
+        elif parent.type == 'block':
+            grand_parent = parent.parent
+            if not grand_parent or grand_parent.type not in ('class_definition', 'function_definition'):
+                return False
+            for child in parent.children:
+                if child.type not in ('comment', 'line_comment'):
+                    return child == node
+        return False
+
+
+def synthetic_module(strings):
+    lines = ["# Generated module", '"""Module docstring."""']
+    for i in range(strings):
+        if i % 100 == 0:
+            lines.append(f"# section {i // 100}")
+        if i % 1000 == 0:
+            lines.append(f"def helper_{i}():\n    # leading comment\n    \"\"\"Helper {i}.\"\"\"\n    return \"value {i}\"")
+        lines.append(f'"constant {i}"')
+    return "\n".join(lines) + "\n"
+
+
+def time_parse(parser, path):
+    start = time.perf_counter()
+    result = parser.parse_file(path)
+    elapsed = time.perf_counter() - start
+    if not result["success"]:
+        sys.exit(f"parse_file failed: {result['error']}")
+    return elapsed, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--strings", type=int, default=50_000, help="top-level strings in the large file")
+    arg_parser.add_argument("--scan-strings", type=int, default=5_000,
+                            help="top-level strings in the file also parsed with the quadratic scan")
+    args = arg_parser.parse_args()
+
+    engines = [
+        ("scan", ScanningElementParser(query_languages=())),
+        ("walk", RepoElementParser(query_languages=())),
+        ("query", RepoElementParser(query_languages=["python"])),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for strings in (args.scan_strings, args.strings):
+            path = os.path.join(tmp, f"strings_{strings}.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(synthetic_module(strings))
+            results = {}
+            for engine, parser in engines:
+                if engine == "scan" and strings > args.scan_strings:
+                    continue
+                elapsed, results[engine] = time_parse(parser, path)
+                elements = results[engine]["elements"]
+                print(f"{strings:>7,d} strings  {engine:5s} {elapsed:8.3f}s  "
+                      f"({len(elements['docstrings'])} docstrings, {len(elements['literals'])} literals)")
+            reference = next(iter(results.values()))
+            mismatches = [engine for engine, result in results.items() if result["elements"] != reference["elements"]]
+            if mismatches:
+                sys.exit(f"Engines disagree on {strings} strings: {', '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Micro-benchmark for code_extraction.extract_code_from_response.
+
+Runs the shared extractor and the original inline-regex implementation over a
+corpus of raw LLM responses, checks that both return identical code, and
+reports responses per second.
+
+Usage:
+    python benchmarks/bench_extraction.py
+    python benchmarks/bench_extraction.py --corpus raw_responses.jsonl --repeat 20
+
+The corpus is either a JSON list of strings or JSONL with one string (or an
+object with a "raw" field) per line. Without --corpus a synthetic corpus that
+mimics recorded responses (fenced blocks, <think> blocks, unfenced code,
+prose-only answers, sample I/O) is used.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from code_extraction import extract_code_from_response  # noqa: E402
+
+
+def legacy_extract_code_from_response(response_text):
+    """The per-call inline-regex version this module replaced (reference only)."""
+    if not response_text:
+        return ""
+    response_text = re.sub(r"<think>[\s\S]*?</think>", "", response_text, flags=re.DOTALL)
+    response_text = re.sub(r"(?i)^(thoughts?|reasoning|analysis)\s*:.*?$", "", response_text, flags=re.MULTILINE)
+    response_text = re.sub(r"(That's the function\.|The code is correct\.|The function is correct\.|Yes, the function returns.*?Therefore, the code is correct\.)", "", response_text, flags=re.MULTILINE)
+    response_text = re.sub(r"Sample Input:.*?Sample Output:.*?(?=\n|$)", "", response_text, flags=re.DOTALL)
+    fenced_blocks = re.findall(r"```[a-zA-Z0-9_+-]*\s*([\s\S]*?)\s*```", response_text)
+    if fenced_blocks:
+        for block in fenced_blocks:
+            clean_block = block.strip()
+            if clean_block and len(clean_block) > 10:
+                return clean_block
+        return fenced_blocks[0].strip() if fenced_blocks else ""
+    code_start = re.search(r"(^|\n)\s*(def |class |import |from |@|if __name__ == ['\"]__main__['\"]:)", response_text)
+    if code_start:
+        candidate = response_text[code_start.start():].strip()
+        candidate = re.split(r"\n\s*(Explanation|Notes?|Output|Result|Example|That's|The code|The function|Yes, the function|Sample Input)\s*:|\n\s*#\s*End", candidate)[0]
+        return candidate.strip()
+    return ""
+
+
+CODE_SNIPPETS = [
+    "def add(a, b):\n    return a + b\n",
+    "import sys\n\n\ndef main():\n    for line in sys.stdin:\n        print(line.strip()[::-1])\n\n\nif __name__ == '__main__':\n    main()\n",
+    "class Stack:\n    def __init__(self):\n        self.items = []\n\n    def push(self, x):\n        self.items.append(x)\n\n    def pop(self):\n        return self.items.pop()\n",
+    "def fib(n):\n    a, b = 0, 1\n    for _ in range(n):\n        a, b = b, a + b\n    return a\n",
+]
+
+PROSE = [
+    "Sure! Here is a solution to your problem.",
+    "Voici une fonction qui résout le problème.",
+    "以下是解决该问题的代码。",
+    "यह फ़ंक्शन समस्या हल करता है।",
+    "The function iterates over the input once.",
+]
+
+
+def synthetic_response(rng):
+    code = rng.choice(CODE_SNIPPETS)
+    prose = rng.choice(PROSE)
+    kind = rng.randrange(6)
+    if kind == 0:
+        return f"{prose}\n\n```python\n{code}```\n\nExplanation: {prose}"
+    if kind == 1:
+        return f"<think>\n{prose * 20}\n```python\nx = 1\n```\n</think>\n```python\n{code}```"
+    if kind == 2:
+        return f"Thoughts: {prose}\n{code}\nExplanation: {prose}"
+    if kind == 3:
+        return f"```py\n{code}```\nSample Input: 3 4\nSample Output: 7\nThe code is correct."
+    if kind == 4:
+        return f"{prose} " * 30
+    return f"```\nok\n```\n{prose}\n```python\n{code}```\n```python\n{code}```"
+
+
+def load_corpus(path):
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".jsonl"):
+        items = [json.loads(line) for line in content.splitlines() if line.strip()]
+    else:
+        items = json.loads(content)
+    return [item["raw"] if isinstance(item, dict) else item for item in items]
+
+
+def time_extractor(func, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--corpus", help="JSON or JSONL file of recorded raw responses")
+    arg_parser.add_argument("--size", type=int, default=5000, help="synthetic corpus size")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        rng = random.Random(args.seed)
+        corpus = [synthetic_response(rng) for _ in range(args.size)]
+
+    mismatches = sum(
+        1 for text in corpus if extract_code_from_response(text) != legacy_extract_code_from_response(text)
+    )
+    print(f"Corpus: {len(corpus)} responses, mismatches vs legacy: {mismatches}")
+
+    total = len(corpus) * args.repeat
+    legacy_s = time_extractor(legacy_extract_code_from_response, corpus, args.repeat)
+    shared_s = time_extractor(extract_code_from_response, corpus, args.repeat)
+    print(f"legacy : {total / legacy_s:>10,.0f} responses/s")
+    print(f"shared : {total / shared_s:>10,.0f} responses/s  ({legacy_s / shared_s:.2f}x)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
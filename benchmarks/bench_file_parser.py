@@ -0,0 +1,118 @@
+"""
+Micro-benchmark for Multi_language_parser.File_parser.RepoElementParser.parse_file.
+
+Parses the example files bundled with the vendored tree-sitter grammars
+(tree-sitter-python/examples/*.py by default) with three engines:
+
+    original  the baseline traversal, frozen in baseline_file_parser.py: a
+              recursive class-name pass, then a recursive extraction pass that
+              looked up each identifier's parents through Node.parent
+    walk      the current single TreeCursor walk (File_parser._extract_elements)
+    query     the queries/<language>.scm captures (query_languages)
+
+checks that the walk and query engines extract the same elements as the
+frozen baseline, and reports per-file and total time, and optionally
+tracemalloc's peak for each engine.
+
+Usage:
+    python benchmarks/bench_file_parser.py
+    python benchmarks/bench_file_parser.py --files "tree-sitter-*/examples/*.*" --repeat 10
+    python benchmarks/bench_file_parser.py --files "tree-sitter-javascript/examples/*.js" --tracemalloc
+
+The tree-sitter library must already be built (Multi_language_parser/build);
+file globs are relative to Multi_language_parser.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+PARSER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Multi_language_parser"))
+sys.path.insert(0, PARSER_DIR)
+# File globs on the command line are relative to Multi_language_parser
+os.chdir(PARSER_DIR)
+
+from File_parser import RepoElementParser  # noqa: E402
+from language_build import PARSERS  # noqa: E402
+from baseline_file_parser import BaselineElementParser  # noqa: E402
+
+
+def time_parser(parser, files, repeat):
+    """Best-of-``repeat`` seconds per file, plus the last results."""
+    timings, results = {}, {}
+    for path in files:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[path] = parser.parse_file(path)
+            best = min(best, time.perf_counter() - start)
+        timings[path] = best
+    return timings, results
+
+
+def peak_memory(parser, path):
+    """Peak bytes traced by tracemalloc while parsing ``path`` once (after a warm-up parse)."""
+    parser.parse_file(path)
+    tracemalloc.start()
+    try:
+        parser.parse_file(path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--files", default="tree-sitter-python/examples/*.py",
+                            help="glob of source files, relative to Multi_language_parser")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--tracemalloc", action="store_true",
+                            help="also report each engine's peak traced memory per file")
+    args = arg_parser.parse_args()
+
+    files = [path for path in sorted(glob.glob(args.files)) if os.path.splitext(path)[1] in PARSERS]
+    if not files:
+        sys.exit(f"No supported files match {args.files}")
+
+    query_languages = sorted({lang_name for _, lang_name in PARSERS.values()})
+    engines = [
+        ("original", BaselineElementParser()),
+        ("walk", RepoElementParser(query_languages=())),
+        ("query", RepoElementParser(query_languages=query_languages)),
+    ]
+    times, results = {}, {}
+    for engine, parser in engines:
+        times[engine], results[engine] = time_parser(parser, files, args.repeat)
+
+    mismatches = [(engine, path) for engine, _ in engines[1:] for path in files
+                  if results[engine][path] != results["original"][path]]
+    print(f"{len(files)} files; mismatches vs original traversal: {len(mismatches)}")
+    print(f"{'':48s} {'':>12s}  " + "  ".join(f"{engine:>10s}" for engine, _ in engines) + "   speedup (walk, query)")
+    rows = [(os.path.basename(path), path) for path in files] + [("total", None)]
+    for label, path in rows:
+        if path is None:
+            lines = ""
+            row = {engine: sum(times[engine].values()) for engine, _ in engines}
+        else:
+            with open(path, "rb") as f:
+                line_count = f.read().count(b"\n")
+            lines = f"{line_count} lines"
+            row = {engine: times[engine][path] for engine, _ in engines}
+        print(f"{label:48s} {lines:>12s}  " + "  ".join(f"{row[engine] * 1000:7.2f} ms" for engine, _ in engines)
+              + f"   {row['original'] / row['walk']:.1f}x {row['original'] / row['query']:.1f}x")
+    if args.tracemalloc:
+        print("\nPeak traced memory per parse_file call:")
+        for path in files:
+            peaks = "  ".join(f"{engine} {peak_memory(parser, path) / 1024:8.1f} KiB" for engine, parser in engines)
+            print(f"{os.path.basename(path):48s} {peaks}")
+    for engine, path in mismatches:
+        print(f"MISMATCH ({engine}): {path}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
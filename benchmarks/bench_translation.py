@@ -0,0 +1,70 @@
+"""
+Translation throughput benchmark per translator backend.
+
+Translates the prompts of an input file into every target language with the
+selected backend (no translation cache) and reports wall time, translations
+per second, characters per second and failures.
+
+Usage:
+    python benchmarks/bench_translation.py --translator replay
+    python benchmarks/bench_translation.py --translator googletrans --limit 5 --concurrency 16
+    python benchmarks/bench_translation.py --translator local --model facebook/nllb-200-distilled-600M --limit 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Prompt_translation import translate_prompts, normalize_text, TARGET_LANG_CODES  # noqa: E402
+from translation_backends import create_translator, TRANSLATOR_NAMES  # noqa: E402
+from pipeline import load_prompts_from_json  # noqa: E402
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--translator", choices=TRANSLATOR_NAMES, default="replay")
+    arg_parser.add_argument("--prompts", default="prompts_input.json")
+    arg_parser.add_argument("--limit", type=int, help="only translate the first N prompts")
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    arg_parser.add_argument("--timeout", type=float, default=30.0)
+    arg_parser.add_argument("--model", help="checkpoint for the local translator")
+    arg_parser.add_argument("--replay-dir", default="data")
+    args = arg_parser.parse_args()
+
+    options = {}
+    if args.translator == "replay":
+        options["root"] = args.replay_dir
+    elif args.translator == "local" and args.model:
+        options["model_name"] = args.model
+    translator = create_translator(args.translator, **options)
+
+    prompts = load_prompts_from_json(args.prompts)[:args.limit]
+    texts = {prompt["id"]: normalize_text(prompt["text"]) for prompt in prompts}
+    targets = [code for code in TARGET_LANG_CODES if code != "en"]
+
+    start = time.perf_counter()
+    # translate_prompt prints every translation; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(translate_prompts(
+            texts, TARGET_LANG_CODES, concurrency=args.concurrency, timeout=args.timeout, translator=translator
+        ))
+    elapsed = time.perf_counter() - start
+    translator.close()
+
+    requested = len(texts) * len(targets)
+    failed = sum(1 for translations in results.values() for code in targets if translations.get(code) is None)
+    chars = sum(len(texts[pid]) for pid in texts) * len(targets)
+    print(f"translator={args.translator} supports_batch={translator.supports_batch} "
+          f"max_batch_chars={translator.max_batch_chars}")
+    print(f"{len(texts)} prompts x {len(targets)} languages = {requested} translations in {elapsed:.2f}s")
+    print(f"{requested / elapsed:,.1f} translations/s, {chars / elapsed:,.0f} source chars/s, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
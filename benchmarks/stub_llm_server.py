@@ -0,0 +1,105 @@
+"""
+Local stub completion server for exercising the HTTP generation backends.
+
+Serves both the Ollama (/api/generate) and OpenAI-compatible (/v1/completions)
+endpoints with a canned fenced Python answer after an optional fixed latency,
+so the pooled, concurrent client in llm_backends.HTTPBackend can be run and
+timed without a real model.
+
+Usage:
+    python benchmarks/stub_llm_server.py --port 11434 --latency 0.5
+    python pipeline.py prompts_input.json --backend ollama --model stub
+    python benchmarks/stub_llm_server.py --bench  # start, time the client, exit
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def canned_completion(prompt):
+    return f"```python\ndef answer():\n    return {len(prompt)}\n```\nExplanation: stub"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling is visible
+    latency = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.latency)
+        text = canned_completion(request.get("prompt", ""))
+        if self.path == "/api/generate":
+            body = {"model": request.get("model"), "response": text, "done": True}
+        elif self.path == "/v1/completions":
+            body = {"model": request.get("model"), "choices": [{"index": 0, "text": text}]}
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0.0):
+    """Start the stub server on a background thread; returns ``(server, base_url)``."""
+    handler = type("Handler", (StubHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def bench(latency, prompts, concurrency):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from llm_backends import HTTPBackend
+
+    server, base_url = start_server(latency=latency)
+    try:
+        for api in ("ollama", "openai"):
+            for workers in (1, concurrency):
+                backend = HTTPBackend("stub", base_url=base_url, api=api, max_concurrency=workers)
+                start = time.perf_counter()
+                codes, retries = backend.generate_batch([f"prompt {i}" for i in range(prompts)])
+                elapsed = time.perf_counter() - start
+                backend.close()
+                ok = sum(1 for code in codes if code)
+                print(f"{api:7s} concurrency={workers:<3d} {prompts} prompts in {elapsed:.2f}s ({ok} with code)")
+    finally:
+        server.shutdown()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--port", type=int, default=11434)
+    arg_parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    arg_parser.add_argument("--bench", action="store_true", help="time the HTTP backend against the stub and exit")
+    arg_parser.add_argument("--prompts", type=int, default=18)
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    args = arg_parser.parse_args()
+
+    if args.bench:
+        bench(args.latency, args.prompts, args.concurrency)
+        return
+
+    server, base_url = start_server(args.port, args.latency)
+    print(f"Stub LLM server listening on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
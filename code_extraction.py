@@ -0,0 +1,174 @@
+"""
+Code extraction from raw LLM responses.
+
+Shared by LLMv2.py and "LLMv2 local .py". All patterns are compiled once at
+module load, and the two hottest steps (stripping <think> blocks and finding
+fenced blocks) are single left-to-right scans using str.find.
+"""
+
+import re
+
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+FENCE = "```"
+
+PREAMBLE_RE = re.compile(r"(?i)^(thoughts?|reasoning|analysis)\s*:.*?$", re.MULTILINE)
+REPETITIVE_RE = re.compile(
+    r"(That's the function\.|The code is correct\.|The function is correct\.|"
+    r"Yes, the function returns.*?Therefore, the code is correct\.)",
+    re.MULTILINE,
+)
+REPETITIVE_MARKERS = (
+    "That's the function.",
+    "The code is correct.",
+    "The function is correct.",
+    "Yes, the function returns",
+)
+SAMPLE_IO_RE = re.compile(r"Sample Input:.*?Sample Output:.*?(?=\n|$)", re.DOTALL)
+FENCE_OPEN_RE = re.compile(r"```[a-zA-Z0-9_+-]*\s*")
+CODE_START_RE = re.compile(r"(^|\n)\s*(def |class |import |from |@|if __name__ == ['\"]__main__['\"]:)")
+TRAILING_PROSE_RE = re.compile(
+    r"\n\s*(Explanation|Notes?|Output|Result|Example|That's|The code|The function|Yes, the function|Sample Input)\s*:"
+    r"|\n\s*#\s*End"
+)
+
+
+def strip_think_blocks(text):
+    """Remove every ``<think>...</think>`` block (non-greedy), leaving unclosed tags alone."""
+    start = text.find(THINK_OPEN)
+    if start == -1:
+        return text
+    parts = []
+    pos = 0
+    while start != -1:
+        end = text.find(THINK_CLOSE, start + len(THINK_OPEN))
+        if end == -1:
+            break
+        parts.append(text[pos:start])
+        pos = end + len(THINK_CLOSE)
+        start = text.find(THINK_OPEN, pos)
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def find_fenced_blocks(text):
+    """Return the body of every fenced block, in order.
+
+    Matches the same blocks as ``re.findall(r"```[a-zA-Z0-9_+-]*\\s*([\\s\\S]*?)\\s*```")``:
+    the opening fence and language tag are matched with a compiled pattern, and
+    the closing fence is located with ``str.find``.
+    """
+    blocks = []
+    opening = FENCE_OPEN_RE.search(text)
+    while opening is not None:
+        start = opening.end()
+        end = text.find(FENCE, start)
+        if end == -1:
+            # No closing fence anywhere after this point, so no later block can close either
+            break
+        blocks.append(text[start:end].rstrip())
+        opening = FENCE_OPEN_RE.search(text, end + len(FENCE))
+    return blocks
+
+
+def extract_code_from_response(response_text):
+    """Extract only the code from the LLM response, removing thinking/narrative.
+
+    Strategy:
+    1) Strip <think>...</think> blocks if present.
+    2) Prefer fenced code blocks (any language). If multiple, return the first clean one.
+    3) If no fences, try to detect code by finding the first code token and return from there.
+    4) If nothing code-like is detected, return an empty string to avoid prose leakage.
+    """
+    if not response_text:
+        return ""
+
+    # Remove thinking process and common preambles
+    response_text = strip_think_blocks(response_text)
+    response_text = PREAMBLE_RE.sub("", response_text)
+
+    # Remove repetitive patterns; the substring checks skip the regex for most responses
+    if any(marker in response_text for marker in REPETITIVE_MARKERS):
+        response_text = REPETITIVE_RE.sub("", response_text)
+    if "Sample Input:" in response_text:
+        response_text = SAMPLE_IO_RE.sub("", response_text)
+
+    # Prefer fenced code blocks of any language
+    fenced_blocks = find_fenced_blocks(response_text) if FENCE in response_text else []
+    if fenced_blocks:
+        # Choose the first clean block (not repetitive)
+        for block in fenced_blocks:
+            clean_block = block.strip()
+            if clean_block and len(clean_block) > 10:  # Avoid empty or very short blocks
+                return clean_block
+        # If no clean block found, return the first one
+        return fenced_blocks[0].strip()
+
+    # Heuristic fallback: try to start from first code-ish token
+    code_start = CODE_START_RE.search(response_text)
+    if code_start:
+        candidate = response_text[code_start.start():].strip()
+        # Truncate trailing non-code sections if they start with typical prose markers
+        candidate = TRAILING_PROSE_RE.split(candidate, maxsplit=1)[0]
+        return candidate.strip()
+
+    # No detectable code found; return empty to avoid dumping narrative into JSON
+    return ""
+
+
+class IncrementalCodeExtractor:
+    """Streaming counterpart of ``extract_code_from_response``.
+
+    Text is fed in chunks as it is generated. The extractor tracks code fences
+    outside ``<think>`` blocks and reports when the first fenced block opens and
+    closes, without rescanning text it has already seen. ``code`` applies the
+    full extraction rules to everything received so far.
+    """
+
+    _LOOKBACK = max(len(FENCE), len(THINK_OPEN), len(THINK_CLOSE)) - 1
+
+    def __init__(self):
+        self.text = ""
+        self.fences = 0
+        self.in_think = False
+        self._scan_pos = 0
+
+    @property
+    def opened(self):
+        return self.fences >= 1
+
+    @property
+    def closed(self):
+        return self.fences >= 2
+
+    @property
+    def code(self):
+        return extract_code_from_response(self.text)
+
+    def feed(self, chunk):
+        """Add a chunk; return True if this chunk closed the first fenced block."""
+        was_closed = self.closed
+        self.text += chunk
+        text = self.text
+        while True:
+            if self.in_think:
+                end = text.find(THINK_CLOSE, self._scan_pos)
+                if end == -1:
+                    break
+                self.in_think = False
+                self._scan_pos = end + len(THINK_CLOSE)
+                continue
+            fence = text.find(FENCE, self._scan_pos)
+            think = text.find(THINK_OPEN, self._scan_pos)
+            if fence == -1 and think == -1:
+                break
+            if think != -1 and (fence == -1 or think < fence):
+                self.in_think = True
+                self._scan_pos = think + len(THINK_OPEN)
+            else:
+                self.fences += 1
+                self._scan_pos = fence + len(FENCE)
+        # A marker may be split across chunks, so rescan the tail next time
+        self._scan_pos = max(self._scan_pos, len(text) - self._LOOKBACK)
+        return self.closed and not was_closed
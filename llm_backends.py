@@ -0,0 +1,321 @@
+"""
+Generation backends for the pipeline.
+
+Every backend turns a list of prompts into ``(codes, retry_counts)`` using the
+same escalating INSTRUCTIONS and code extraction, so pipeline.py does not care
+where generation runs:
+
+    transformers  in-process Hugging Face model (LLMv2.ModelSession)
+    ollama        HTTP client for an Ollama server (/api/generate)
+    openai        HTTP client for an OpenAI-compatible server (/v1/completions)
+    fake          deterministic offline backend for tests and dry runs
+
+This module does not import torch or transformers; the transformers backend is
+only imported when it is selected.
+"""
+
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from code_extraction import extract_code_from_response
+
+
+# Instructions used on successive attempts; later entries are stricter
+INSTRUCTIONS = [
+    (
+        "You are to output ONLY Python code that solves the user's request. "
+        "Respond with a single fenced block using ```python ... ```. "
+        "Do not include any explanations, narration, or thinking outside the fence.\n\n"
+    ),
+    (
+        "Return ONLY a single fenced Python block with the final code. "
+        "Absolutely no prose. If you cannot, return an empty code block.\n\n"
+    ),
+    (
+        "ONLY output Python code. No explanations, no examples, no testing. "
+        "Just the code in a fenced block: ```python\n[code here]\n```\n\n"
+    ),
+]
+
+DEFAULT_MAX_NEW_TOKENS = 512
+
+# Prose markers after which nothing useful is generated; extraction discards them anyway.
+# They only count before the code fence opens: inside it they may be code
+DEFAULT_STOP_STRINGS = ("Explanation:", "Sample Input:")
+
+CODE_FENCE = "```"
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+DEFAULT_OPENAI_URL = "http://localhost:8000"
+
+BACKEND_NAMES = ("transformers", "ollama", "openai", "fake")
+
+
+def instruction_for_attempt(attempt: int) -> str:
+    """Return the instruction preamble for a zero-based attempt number."""
+    return INSTRUCTIONS[min(attempt, len(INSTRUCTIONS) - 1)]
+
+
+def _timed_call(log_duration, label: str, call):
+    """Run ``call()``, reporting its duration and outcome to ``log_duration`` when given."""
+    start_perf = time.perf_counter()
+    start_wall = time.time()
+    try:
+        result = call()
+    except Exception as e:
+        if log_duration is not None:
+            log_duration(label, start_wall, time.time(), time.perf_counter() - start_perf,
+                         success=False, error_message=str(e))
+        raise
+    if log_duration is not None:
+        log_duration(label, start_wall, time.time(), time.perf_counter() - start_perf, success=True)
+    return result
+
+
+def trim_completion(text: str, stop_strings=DEFAULT_STOP_STRINGS) -> str:
+    """Cut a completion where LLMv2.CodeBlockStoppingCriteria would have stopped it.
+
+    That is at the first stop string in the prose before the opening fence, or
+    after the closing fence.
+    """
+    opening = text.find(CODE_FENCE)
+    prose = text if opening == -1 else text[:opening]
+    stops = [prose.find(stop) for stop in stop_strings or () if stop in prose]
+    if stops:
+        return text[:min(stops)]
+    if opening != -1:
+        closing = text.find(CODE_FENCE, opening + len(CODE_FENCE))
+        if closing != -1:
+            return text[:closing + len(CODE_FENCE)]
+    return text
+
+
+class GenerationBackend(ABC):
+    """Base class for code generation backends.
+
+    Subclasses implement ``complete(text)``, returning the raw completion for a
+    full prompt, and may override ``generate_batch`` as well (as the
+    transformers backend does to batch on the device).
+    """
+
+    name = "base"
+    # Request errors worth retrying (with backoff) in ``generate_one``; any other
+    # exception from ``complete`` propagates at once
+    transient_errors: Tuple[type, ...] = ()
+    retry_delay = 1.0
+
+    def __init__(self, model_name: str, max_batch_size: int = 1):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        # Nothing to load for remote/fake backends; the pipeline still logs these
+        self.load_started = self.load_finished = time.time()
+        self.load_seconds = 0.0
+
+    @abstractmethod
+    def complete(self, text: str) -> str:
+        """Raw completion for ``text`` (instruction and prompt)."""
+
+    def generate_one(self, prompt: str, max_retries: int = 3) -> Tuple[str, int]:
+        """Generate code for one prompt with escalating instructions; returns ``(code, retries)``.
+
+        A request that fails with one of ``transient_errors`` counts as an attempt
+        and is retried after an exponential backoff; the error is re-raised if the
+        last attempt fails.
+        """
+        code_only = ""
+        for attempt in range(max_retries):
+            try:
+                completion = self.complete(instruction_for_attempt(attempt) + prompt)
+            except self.transient_errors as e:
+                if attempt == max_retries - 1:
+                    raise
+                print(f"  Generation attempt {attempt + 1} failed: {e}")
+                time.sleep(self.retry_delay * 2 ** attempt)
+                continue
+            code_only = extract_code_from_response(completion)
+            if code_only.strip():
+                return code_only, attempt
+        return code_only, max_retries - 1
+
+    def generate(self, prompt: str, max_retries: int = 3) -> str:
+        return self.generate_one(prompt, max_retries)[0]
+
+    def generate_batch(self, prompts: List[str], max_retries: int = 3) -> Tuple[List[str], List[int]]:
+        """Generate code for each prompt; returns ``(codes, retry_counts)`` in input order."""
+        results = [self.generate_one(prompt, max_retries) for prompt in prompts]
+        return [code for code, _ in results], [retries for _, retries in results]
+
+    def generate_each(self, prompts: List[str], max_retries: int = 3, labels: Optional[List[str]] = None,
+                      log_duration=None) -> Tuple[List[Optional[str]], List[Optional[int]], List[Optional[Exception]]]:
+        """Generate code for ``prompts`` as one batch, then one prompt at a time if the batch fails.
+
+        Returns ``(codes, retry_counts, errors)`` in input order; a prompt that still
+        fails gets None code and retry count and its exception in ``errors``, so one
+        bad prompt never costs the others their output. ``log_duration(label,
+        start_ts, end_ts, seconds, success=..., error_message=...)`` is called for the
+        batch (labels joined by commas) and for each prompt retried on its own;
+        ``labels`` default to the prompt indices.
+        """
+        labels = list(labels) if labels is not None else [str(i) for i in range(len(prompts))]
+        errors: List[Optional[Exception]] = [None] * len(prompts)
+        try:
+            codes, retry_counts = _timed_call(log_duration, ",".join(labels),
+                                              lambda: self.generate_batch(prompts, max_retries))
+            return list(codes), list(retry_counts), errors
+        except Exception as e:
+            print(f"Batch generation failed ({e}); retrying prompts one at a time")
+        codes: List[Optional[str]] = [None] * len(prompts)
+        retry_counts: List[Optional[int]] = [None] * len(prompts)
+        for i, prompt in enumerate(prompts):
+            try:
+                (codes[i],), (retry_counts[i],) = _timed_call(log_duration, labels[i],
+                                                              lambda: self.generate_batch([prompt], max_retries))
+            except Exception as e:
+                errors[i] = e
+        return codes, retry_counts, errors
+
+    def generate_streaming(self, prompt: str, max_retries: int = 3, on_chunk=None) -> Tuple[str, int, Dict[str, Any]]:
+        """Fallback for backends without token streaming: one chunk holding the final code."""
+        start_perf = time.perf_counter()
+        code_only, retries = self.generate_one(prompt, max_retries)
+        duration = time.perf_counter() - start_perf
+        if on_chunk is not None:
+            on_chunk(code_only, None)
+        return code_only, retries, {"ttft_s": duration, "duration_s": duration, "chunks": 1}
+
+    def close(self) -> None:
+        pass
+
+
+class HTTPBackend(GenerationBackend):
+    """Client for an Ollama or OpenAI-compatible completion server.
+
+    A single ``requests.Session`` with a keep-alive connection pool sized to
+    ``max_concurrency`` is reused for every request, and the prompts of a batch
+    are sent concurrently so the server can batch them on its side. Each prompt
+    escalates its own instruction on retry; successful prompts are not re-sent.
+
+    Stop strings are applied to the completion here (``trim_completion``) rather
+    than sent to the server, which cannot tell whether a code fence is open.
+    """
+
+    def __init__(self, model_name: str, base_url: Optional[str] = None, api: str = "ollama",
+                 max_concurrency: int = 8, timeout: float = 300.0,
+                 max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS, stop_strings=DEFAULT_STOP_STRINGS):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if api not in ("ollama", "openai"):
+            raise ValueError(f"Unsupported HTTP API: {api}")
+        super().__init__(model_name, max_batch_size=max_concurrency)
+        self.name = api
+        self.api = api
+        self.base_url = (base_url or (DEFAULT_OLLAMA_URL if api == "ollama" else DEFAULT_OPENAI_URL)).rstrip("/")
+        self.timeout = timeout
+        self.max_new_tokens = max_new_tokens
+        self.stop_strings = list(stop_strings or ())
+
+        self.transient_errors = (requests.RequestException,)
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def complete(self, text: str) -> str:
+        if self.api == "ollama":
+            payload = {
+                "model": self.model_name,
+                "prompt": text,
+                "stream": False,
+                "options": {"temperature": 0.7, "num_predict": self.max_new_tokens},
+            }
+            response = self.http.post(f"{self.base_url}/api/generate", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return trim_completion(response.json().get("response", ""), self.stop_strings)
+
+        payload = {
+            "model": self.model_name,
+            "prompt": text,
+            "max_tokens": self.max_new_tokens,
+            "temperature": 0.7,
+        }
+        response = self.http.post(f"{self.base_url}/v1/completions", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        choices = response.json().get("choices") or [{}]
+        return trim_completion(choices[0].get("text", ""), self.stop_strings)
+
+    def generate_batch(self, prompts: List[str], max_retries: int = 3) -> Tuple[List[str], List[int]]:
+        results = list(self._executor.map(lambda prompt: self.generate_one(prompt, max_retries), prompts))
+        return [code for code, _ in results], [retries for _, retries in results]
+
+    def generate_each(self, prompts: List[str], max_retries: int = 3, labels: Optional[List[str]] = None,
+                      log_duration=None) -> Tuple[List[Optional[str]], List[Optional[int]], List[Optional[Exception]]]:
+        # Prompts are sent independently, so each one is timed and fails on its own
+        # instead of re-sending the whole batch after a failure
+        labels = list(labels) if labels is not None else [str(i) for i in range(len(prompts))]
+        futures = [
+            self._executor.submit(_timed_call, log_duration, label, lambda prompt=prompt: self.generate_one(prompt, max_retries))
+            for label, prompt in zip(labels, prompts)
+        ]
+        codes: List[Optional[str]] = [None] * len(prompts)
+        retry_counts: List[Optional[int]] = [None] * len(prompts)
+        errors: List[Optional[Exception]] = [None] * len(prompts)
+        for i, future in enumerate(futures):
+            try:
+                codes[i], retry_counts[i] = future.result()
+            except Exception as e:
+                errors[i] = e
+        return codes, retry_counts, errors
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.http.close()
+
+
+class FakeBackend(GenerationBackend):
+    """Deterministic offline backend: the same prompt always yields the same code.
+
+    ``failures_per_prompt`` makes the first N attempts for every prompt return
+    prose only, which exercises the retry path without a model.
+    """
+
+    name = "fake"
+
+    def __init__(self, model_name: str = "fake", max_batch_size: int = 8, failures_per_prompt: int = 0):
+        super().__init__(model_name, max_batch_size=max_batch_size)
+        self.failures_per_prompt = failures_per_prompt
+        self.calls = 0
+
+    def complete(self, text: str) -> str:
+        self.calls += 1
+        attempt = next((i for i, instruction in enumerate(INSTRUCTIONS) if text.startswith(instruction)), 0)
+        if attempt < self.failures_per_prompt:
+            return "I cannot answer that right now."
+        prompt = text[len(instruction_for_attempt(attempt)):]
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        return (
+            "```python\n"
+            f"def solution_{digest}(value):\n"
+            f"    \"\"\"{prompt[:40]}\"\"\"\n"
+            f"    return value * {len(prompt)}\n"
+            "```\n"
+        )
+
+
+def create_backend(name: str, model_name: Optional[str] = None, base_url: Optional[str] = None,
+                   max_batch_size: Optional[int] = None, **options) -> GenerationBackend:
+    """Build a backend by name; extra ``options`` go to the backend constructor."""
+    if name == "transformers":
+        from LLMv2 import ModelSession, MODEL_NAME, DEFAULT_MAX_BATCH_SIZE
+        return ModelSession(model_name or MODEL_NAME, max_batch_size=max_batch_size or DEFAULT_MAX_BATCH_SIZE, **options)
+    if name in ("ollama", "openai"):
+        if not model_name:
+            raise ValueError(f"--model is required for the {name} backend")
+        return HTTPBackend(model_name, base_url=base_url, api=name, max_concurrency=max_batch_size or 8)
+    if name == "fake":
+        return FakeBackend(model_name or "fake", max_batch_size=max_batch_size or 8)
+    raise ValueError(f"Unknown backend '{name}'; expected one of {', '.join(BACKEND_NAMES)}")
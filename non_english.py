@@ -14,18 +14,37 @@ def ensure_mlp_on_path(project_root: str) -> str:
     return mlp_dir
 
 
-def classify_text(text: str) -> str:
-    """Return script label using Multi_language_parser.language_detection.classify_string."""
-    try:
-        from language_detection import classify_string  # type: ignore
-        return classify_string(text).get("script", "Unknown")
-    except Exception:
-        # Fallback: simple ASCII check
+def ascii_fallback_classify(text: str) -> str:
+    """Two-bucket classification used when language_detection is unavailable."""
+    return "English/ASCII" if text.isascii() else "Non-English"
+
+
+# Resolve the classifier once: Multi_language_parser.language_detection if it
+# imports, otherwise the plain ASCII check
+ensure_mlp_on_path(os.path.abspath(os.path.dirname(__file__)))
+try:
+    from language_detection import classify_string  # type: ignore
+
+    def _classify_script(text: str) -> str:
         try:
-            text.encode("ascii")
-            return "English/ASCII"
+            return classify_string(text).get("script", "Unknown")
         except Exception:
-            return "Non-English"
+            # One bad string falls back on its own instead of failing the batch
+            return ascii_fallback_classify(text)
+except Exception:
+    _classify_script = ascii_fallback_classify
+
+
+def classify_text(text: str) -> str:
+    """Return script label using Multi_language_parser.language_detection.classify_string."""
+    return _classify_script(text)
+
+
+def classify_many(values: List[Any]) -> List[str]:
+    """Classify a whole list of values; repeated values are classified once."""
+    texts = [str(value) for value in values]
+    scripts = {text: _classify_script(text) for text in dict.fromkeys(texts)}
+    return [scripts[text] for text in texts]
 
 
 def aggregate_counts(elements: Dict[str, List[str]]) -> Dict[str, Any]:
@@ -44,8 +63,7 @@ def aggregate_counts(elements: Dict[str, List[str]]) -> Dict[str, Any]:
 
     for cat in categories:
         values = elements.get(cat, []) or []
-        for value in values:
-            script = classify_text(str(value))
+        for script in classify_many(values):
             # Normalize to two buckets for overview; keep script names for detail
             bucket = "English/ASCII" if script == "English/ASCII" else script or "Non-English"
             overall[bucket] += 1
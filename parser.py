@@ -9,8 +9,8 @@ from typing import Dict, Any
 def parse_code_files_with_multilang_parser(code_by_lang: Dict[str, str]) -> Dict[str, Any]:
     """Write code strings to temp files, run Multi_language_parser on each, return results.
 
-    Note: Multi_language_parser's language build uses relative paths, so we chdir into
-    the Multi_language_parser directory during parsing, then restore the cwd.
+    Multi_language_parser resolves its paths against its own directory, so this
+    does not change the working directory and is safe to call from a worker thread.
     """
     project_root = os.path.abspath(os.path.dirname(__file__))
     mlp_dir = os.path.join(project_root, "Multi_language_parser")
@@ -18,7 +18,6 @@ def parse_code_files_with_multilang_parser(code_by_lang: Dict[str, str]) -> Dict
     temp_dir = tempfile.mkdtemp(prefix="llm_code_")
     results: Dict[str, Any] = {}
 
-    original_cwd = os.getcwd()
     try:
         # Prepare temp files (assume generated code is Python)
         lang_to_file = {}
@@ -33,13 +32,11 @@ def parse_code_files_with_multilang_parser(code_by_lang: Dict[str, str]) -> Dict
         if not lang_to_file:
             return {"success": False, "error": "No code snippets to parse"}
 
-        # Ensure Python can import modules from Multi_language_parser and
-        # switch CWD so relative paths in language_build work.
+        # Ensure Python can import modules from Multi_language_parser
         if mlp_dir not in sys.path:
             sys.path.insert(0, mlp_dir)
-        os.chdir(mlp_dir)
 
-        # Import after sys.path update and chdir so language_build resolves correctly
+        # Import after the sys.path update so language_build resolves correctly
         from File_parser import RepoElementParser  # type: ignore
 
         parser = RepoElementParser()
@@ -53,8 +50,7 @@ def parse_code_files_with_multilang_parser(code_by_lang: Dict[str, str]) -> Dict
         return {"success": True, "results": results}
 
     finally:
-        # Restore working directory and clean up temp dir
-        os.chdir(original_cwd)
+        # Clean up temp dir
         shutil.rmtree(temp_dir, ignore_errors=True)
 
 
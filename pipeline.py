@@ -6,23 +6,40 @@ This pipeline processes prompts through translation, LLM generation, and analysi
 Usage:
     python pipeline.py prompts.json --model Qwen/Qwen3-30B-A3B-Instruct-2507
     python pipeline.py prompts.json  # Uses default model
+    python pipeline.py prompts.json --backend ollama --model qwen3:8b  # Local Ollama server
+    python pipeline.py prompts.json --backend openai --model MODEL --backend-url http://localhost:8000
+    python pipeline.py prompts.json --backend fake  # Deterministic offline run
+    python pipeline.py prompts.json --batch-size 4  # Limit generation batch size
+    python pipeline.py prompts.json --max-tokens-per-sec 40  # Throttle generation throughput
+    python pipeline.py prompts.json --duty-cycle 0.8  # Idle 20% of the time to limit heat
+    python pipeline.py prompts.json --stream  # Stream output; parse each language while the next generates
+    python pipeline.py prompts.json --translate-concurrency 16 --translate-timeout 20  # Translation fan-out
+    python pipeline.py prompts.json --no-translation-cache  # Re-translate instead of using data/translation_cache.jsonl
+    python pipeline.py prompts.json --translator replay  # Offline: reuse data/*/translated_prompts.json
+    python pipeline.py prompts.json --translator local --translator-model facebook/nllb-200-distilled-600M
+    python pipeline.py prompts.json --translate-attempts 5  # Retry failed translations with backoff
+    python pipeline.py --retry-failed  # Re-translate only null entries in data/*/translated_prompts.json
 
 Features:
-    - Uses LLMv2.py with Hugging Face transformers models
+    - Pluggable generation backends: transformers (LLMv2.py), Ollama/OpenAI-compatible HTTP, fake
+    - Batched multi-language generation
     - Code extraction and retry logic
     - GPU optimization with automatic device mapping
-    - Multi-language prompt translation
+    - Concurrent multi-language prompt translation with pluggable translators (translation_backends.py)
     - Tree-sitter code parsing and analysis
 """
 
 import os
 import sys
 import json
-import asyncio
+import glob
 import time
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+
+
+DEFAULT_MODEL_NAME = "Qwen/Qwen3-30B-A3B-Instruct-2507"
 
 
 def ensure_dirs() -> str:
@@ -64,74 +81,280 @@ def load_prompts_from_json(json_file: str) -> List[Dict[str, str]]:
         raise ValueError(f"Invalid JSON format: {e}")
 
 
-def translate_prompt(prompt_text: str) -> Dict[str, Optional[str]]:
-    # Delegate to Prompt_translation.translate_prompt (async) with TARGET_LANG_CODES
-    from Prompt_translation import translate_prompt as pt_translate_prompt, TARGET_LANG_CODES
-
+def normalize_prompt_text(prompt_text: str) -> str:
     try:
-        return asyncio.run(pt_translate_prompt(prompt_text, TARGET_LANG_CODES))
-    except RuntimeError:
-        # Fallback if an event loop is already running
-        loop = asyncio.get_event_loop()
-        return loop.run_until_complete(pt_translate_prompt(prompt_text, TARGET_LANG_CODES))
+        from Prompt_translation import normalize_text
+        return normalize_text(prompt_text)
+    except Exception:
+        # Fallback to original prompt if normalization import fails
+        return prompt_text
+
+
+def translate_prompt(prompt_text: str, translation_session) -> Dict[str, Optional[str]]:
+    # Delegate to Prompt_translation.translate_prompt on the session's event loop
+    return translation_session.translate(prompt_text)
+
+
+def translate_all_prompts(prompts: List[Dict[str, str]], translation_session) -> Dict[str, Dict[str, Optional[str]]]:
+    """Pre-translate every prompt in one concurrent pass; returns prompt id -> translations."""
+    texts = {prompt_data['id']: normalize_prompt_text(prompt_data['text']) for prompt_data in prompts}
+    return translation_session.translate_many(texts)
+
+
+def load_translator(translator_name: str = "googletrans", data_dir: str = "data", model_name: Optional[str] = None,
+                    replay_dir: Optional[str] = None):
+    """Create the translation backend selected with --translator."""
+    from translation_backends import create_translator
+    options: Dict[str, Any] = {}
+    if translator_name == "replay":
+        options["root"] = replay_dir or data_dir
+    elif translator_name == "local" and model_name:
+        options["model_name"] = model_name
+    print(f"Translator: {translator_name}")
+    return create_translator(translator_name, **options)
+
+
+def open_translation_cache(data_dir: str, enabled: bool = True, translator=None):
+    """Open the persistent translation cache under ``data_dir`` (None when disabled).
+
+    Each translator gets its own cache file so translations from different
+    backends are never mixed; googletrans keeps translation_cache.jsonl.
+    """
+    if not enabled or (translator is not None and not translator.cacheable):
+        return None
+    from translation_cache import TranslationCache
+    filename = "translation_cache.jsonl"
+    if translator is not None and translator.name != "googletrans":
+        filename = f"translation_cache.{translator.name}.jsonl"
+    cache = TranslationCache(os.path.join(data_dir, filename))
+    print(f"Translation cache: {len(cache)} entries")
+    return cache
+
+
+def open_translation_session(data_dir: str, translator_name: str = "googletrans", model_name: Optional[str] = None,
+                             replay_dir: Optional[str] = None, concurrency: Optional[int] = None,
+                             timeout: Optional[float] = None, use_cache: bool = True,
+                             max_attempts: Optional[int] = None):
+    """
+    Create the translation session once for the whole run.
+
+    The session owns the translator (one pooled HTTP client for googletrans),
+    the translation cache, the retry policy and circuit breaker, and a single
+    long-lived event loop; close it at the end. Failed translation attempts
+    are logged to data/translation_failures.jsonl.
+    """
+    from Prompt_translation import TranslationSession, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT
+    from translation_retry import TranslationRetry, FailureLog
+    translator = load_translator(translator_name, data_dir, model_name, replay_dir)
+    retry = TranslationRetry(
+        max_attempts=max_attempts or 3,
+        failure_log=FailureLog(os.path.join(data_dir, "translation_failures.jsonl")),
+    )
+    return TranslationSession(
+        translator,
+        concurrency=concurrency or DEFAULT_CONCURRENCY,
+        timeout=timeout or DEFAULT_TIMEOUT,
+        cache=open_translation_cache(data_dir, use_cache, translator),
+        retry=retry,
+    )
+
+
+def retry_failed_translations(data_dir: str, translation_session) -> Tuple[int, int]:
+    """
+    Re-translate only the missing (null) entries of existing translated_prompts.json files.
 
+    Returns ``(prompts_with_missing_entries, entries_filled)``. Files are rewritten in place;
+    entries that fail again stay null (and are logged) for a later retry.
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, "*", "translated_prompts.json")))
+    loaded: Dict[str, Dict[str, Optional[str]]] = {}
+    missing: Dict[str, Dict[str, str]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            translations = json.load(f)
+        source = translations.get("en")
+        if not source:
+            continue
+        loaded[path] = translations
+        for code, text in translations.items():
+            if text is None:
+                missing.setdefault(code, {})[path] = source
+
+    total = sum(len(texts) for texts in missing.values())
+    print(f"Retrying {total} failed translations across {len(loaded)} prompts")
+    filled = 0
+    for code, texts in missing.items():
+        results = translation_session.translate_many(texts, [code])
+        for path, result in results.items():
+            if result.get(code) is not None:
+                loaded[path][code] = result[code]
+                filled += 1
+
+    retried_paths = {path for texts in missing.values() for path in texts}
+    for path in retried_paths:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(loaded[path], f, ensure_ascii=False, indent=2)
+    print(f"Filled {filled}/{total} missing translations; {total - filled} still missing")
+    return len(retried_paths), filled
+
+
+def log_translation_stage(prompt_count: int, seconds: float, cache=None, retry=None) -> None:
+    """Log translation stage time, retries and failures, and (when caching) cache hits and misses."""
+    message = f"phase=translate\tprompts={prompt_count}\tduration_s={seconds:.3f}"
+    if retry is not None:
+        message += f"\tretries={retry.retries}\tfailures={retry.failures}\tbreaker_opened={retry.breaker.times_opened}"
+    if cache is not None:
+        stats = cache.stats()
+        message += f"\tcache_hits={stats['hits']}\tcache_misses={stats['misses']}\tcache_writes={stats['writes']}"
+        print(f"Translation cache: {stats['hits']} hits, {stats['misses']} misses, {stats['writes']} new entries")
+    logging.info(message)
+
+
+def load_generation_backend(backend_name: str = "transformers", model_name: str = None, base_url: str = None,
+                            max_batch_size: Optional[int] = None, **options):
+    """
+    Create the generation backend once for the whole run.
+
+    Args:
+        backend_name: One of llm_backends.BACKEND_NAMES (transformers, ollama, openai, fake)
+        model_name: Model name (transformers defaults to Qwen/Qwen3-30B-A3B-Instruct-2507)
+        base_url: Server URL for the HTTP backends
+        max_batch_size: Largest batch (transformers) or number of concurrent requests (HTTP)
+        options: Backend-specific options, e.g. ``governor`` for transformers
+    """
+    from llm_backends import create_backend
 
-def query_llm_for_translations(translations: Dict[str, str], model_name: str = None) -> Dict[str, str]:
+    if backend_name == "transformers":
+        model_name = model_name or DEFAULT_MODEL_NAME
+    session = create_backend(backend_name, model_name, base_url=base_url, max_batch_size=max_batch_size, **options)
+    log_model_load(session.model_name, session.load_started, session.load_finished, session.load_seconds)
+    return session
+
+
+def query_llm_for_translations(translations: Dict[str, str], session) -> Tuple[Dict[str, str], Dict[str, int]]:
     """
-    Query LLM for translations using LLMv2.py with transformers models.
+    Query the generation backend for all translations of a prompt.
     
     Args:
         translations: Dictionary of language -> prompt translations
-        model_name: Model name (defaults to Qwen/Qwen3-30B-A3B-Instruct-2507)
-    """
-    outputs: Dict[str, str] = {}
+        session: Generation backend (llm_backends.GenerationBackend) shared across prompts
     
-    # Use LLMv2.py with transformers models
-    from LLMv2 import generate_code_with_retry, extract_code_from_response
-    from transformers import AutoTokenizer, AutoModelForCausalLM
-    import torch
+    Returns:
+        (outputs, retries): language -> generated code, and language -> number of retries
+    """
+    outputs: Dict[str, str] = {lang: None for lang in translations}
+    retries: Dict[str, int] = {}
     
-    # Initialize model and tokenizer
-    model_name = model_name or "Qwen/Qwen3-30B-A3B-Instruct-2507"
-    device = "cuda" if torch.cuda.is_available() else "cpu"
+    # All language variants of a prompt are independent, so generate them as one batch
+    langs = [lang for lang, prompt in translations.items() if prompt]
+    if not langs:
+        return outputs, retries
     
-    print(f"Loading model: {model_name}")
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForCausalLM.from_pretrained(
-        model_name, 
-        device_map="auto", 
-        torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32
+    print(f"Querying {session.name} backend for {len(langs)} languages in batches of up to {session.max_batch_size}...")
+    results, retry_counts, errors = session.generate_each(
+        [translations[lang] for lang in langs], labels=langs, log_duration=log_llm_duration
     )
+    for lang, result, retry_count, error in zip(langs, results, retry_counts, errors):
+        if error is not None:
+            print(f"LLM query failed for {lang}: {error}")
+            continue
+        outputs[lang] = result
+        retries[lang] = retry_count
+        print(f"Generated code for {lang} after {retry_count} retries: {str(result)[:100]}...")
+    return outputs, retries
+
+
+def query_llm_streaming(translations: Dict[str, str], session, on_code=None) -> Tuple[Dict[str, str], Dict[str, int], Dict[str, float]]:
+    """
+    Query LLM one language at a time with streamed output.
+    
+    Args:
+        translations: Dictionary of language -> prompt translations
+        session: Generation backend (llm_backends.GenerationBackend) shared across prompts
+        on_code: Optional callback ``on_code(lang, code)`` run as soon as a language's fenced
+            block closes in the stream, and again with the final code if that differs
     
-    def query_func(prompt):
-        return generate_code_with_retry(tokenizer, model, prompt, device)
+    Returns:
+        (outputs, retries, ttft): generated code, retry counts and time to first token per language
+    """
+    outputs: Dict[str, str] = {}
+    retries: Dict[str, int] = {}
+    ttft: Dict[str, float] = {}
     
     for lang, prompt in translations.items():
         if not prompt:
             outputs[lang] = None
             continue
+        print(f"Streaming {session.name} backend output for {lang}...")
+        early_code = None
+
+        def on_chunk(chunk, extractor):
+            nonlocal early_code
+            # The block just closed: start on the code while generate winds down
+            if on_code is None or early_code is not None or extractor is None or not extractor.closed:
+                return
+            code = extractor.code
+            if code.strip():
+                early_code = code
+                on_code(lang, code)
+
+        start_perf = time.perf_counter()
+        start_wall = time.time()
         try:
-            print(f"Querying transformers LLM for {lang}...")
-            start_perf = time.perf_counter()
-            start_wall = time.time()
-            try:
-                result = query_func(prompt)
-                end_wall = time.time()
-                duration = time.perf_counter() - start_perf
-                log_llm_duration(lang, start_wall, end_wall, duration, success=True)
-                outputs[lang] = result
-                print(f"Generated code for {lang}: {str(result)[:100]}...")
-            except Exception as inner_e:
-                end_wall = time.time()
-                duration = time.perf_counter() - start_perf
-                log_llm_duration(lang, start_wall, end_wall, duration, success=False, error_message=str(inner_e))
-                print(f"LLM query failed for {lang}: {inner_e}")
-                outputs[lang] = None
-            time.sleep(1)
+            result, retry_count, metrics = session.generate_streaming(prompt, on_chunk=on_chunk)
+            end_wall = time.time()
+            duration = time.perf_counter() - start_perf
+            log_llm_duration(lang, start_wall, end_wall, duration, success=True)
+            log_stream_metrics(lang, metrics)
+            outputs[lang] = result
+            retries[lang] = retry_count
+            ttft[lang] = metrics.get("ttft_s")
+            print(f"Generated code for {lang} after {retry_count} retries: {str(result)[:100]}...")
+            if on_code is not None and result and result != early_code:
+                on_code(lang, result)
         except Exception as e:
+            end_wall = time.time()
+            duration = time.perf_counter() - start_perf
+            log_llm_duration(lang, start_wall, end_wall, duration, success=False, error_message=str(e))
             print(f"LLM query failed for {lang}: {e}")
             outputs[lang] = None
-    return outputs
+    return outputs, retries, ttft
+
+
+def generate_and_parse_streaming(translations: Dict[str, str], session) -> Tuple[Dict[str, str], Dict[str, Any], Dict[str, Any]]:
+    """
+    Stream generation and parse each language in the background, starting as soon as its
+    fenced block closes in the stream, while the rest of the run generates.
+    
+    Returns:
+        (outputs, stats, parsed) with ``parsed`` shaped like ``parse_llm_outputs``.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from parser import parse_code_files_with_multilang_parser
+    
+    # One worker, so parsing overlaps generation without competing with itself for the CPU
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        futures = {}
+        
+        def on_code(lang: str, code: str) -> None:
+            futures[lang] = executor.submit(parse_code_files_with_multilang_parser, {lang: code})
+        
+        outputs, retries, ttft = query_llm_streaming(translations, session, on_code)
+        
+        results: Dict[str, Any] = {}
+        for lang, future in futures.items():
+            if outputs.get(lang) is None:
+                # Generation failed after the block closed; drop the early parse
+                continue
+            try:
+                parsed_one = future.result()
+            except Exception as e:
+                results[lang] = {"success": False, "error": str(e)}
+                continue
+            results.update(parsed_one.get("results", {}))
+    
+    parsed = {"success": True, "results": results} if results else {"success": False, "error": "No code snippets to parse"}
+    return outputs, {"retries": retries, "ttft_s": ttft}, parsed
 
 
 def parse_llm_outputs(outputs: Dict[str, str]) -> Dict[str, Any]:
@@ -176,45 +399,89 @@ def log_llm_duration(language: str, start_ts: float, end_ts: float, seconds: flo
         )
 
 
-def process_single_prompt(prompt_data: Dict[str, str], data_dir: str, model_name: str = None) -> None:
-    """Process a single prompt through the entire pipeline."""
+def log_stream_metrics(language: str, metrics: Dict[str, Any]) -> None:
+    """Log time to first token and total streamed generation time for one language."""
+    ttft = metrics.get("ttft_s")
+    ttft_text = f"{ttft:.3f}" if ttft is not None else "none"
+    logging.info(
+        f"lang={language}\tphase=stream\tttft_s={ttft_text}\tduration_s={metrics.get('duration_s') or 0:.3f}"
+        f"\tchunks={metrics.get('chunks', 0)}"
+    )
+
+
+def log_model_load(model_name: str, start_ts: float, end_ts: float, seconds: float) -> None:
+    """Log the one-off model load time separately from per-language generation time."""
+    start_iso = datetime.fromtimestamp(start_ts).isoformat(timespec="seconds")
+    end_iso = datetime.fromtimestamp(end_ts).isoformat(timespec="seconds")
+    logging.info(
+        f"model={model_name}\tphase=load\tstart={start_iso}\tend={end_iso}\tduration_min={seconds / 60.0:.3f}"
+    )
+
+
+def log_prompt_generation(prompt_id: str, seconds: float, load_seconds: float) -> None:
+    """Log total generation time for one prompt next to the (shared) model load time."""
+    logging.info(
+        f"prompt={prompt_id}\tphase=generate\tduration_min={seconds / 60.0:.3f}\tmodel_load_min={load_seconds / 60.0:.3f}"
+    )
+
+
+def process_single_prompt(prompt_data: Dict[str, str], data_dir: str, session, stream: bool = False,
+                          translations: Optional[Dict[str, Optional[str]]] = None, translation_session=None) -> None:
+    """Process a single prompt through the entire pipeline.
+
+    With ``stream`` set, languages are generated one at a time with streamed
+    output and each one is parsed while the next is still generating.
+    ``translations`` skips the translation step when the prompt was already
+    translated (see ``translate_all_prompts``); otherwise the prompt is
+    translated with ``translation_session`` (a default one if not given).
+    """
     prompt_id = prompt_data['id']
     prompt_text = prompt_data['text']
     
     print(f"\n{'='*60}")
     print(f"Processing Prompt ID: {prompt_id}")
-    print(f"Using model: {model_name or 'Qwen/Qwen3-30B-A3B-Instruct-2507 (default)'}")
+    print(f"Using model: {session.model_name}")
     print("Features: Code extraction, retry logic, GPU optimization")
     print(f"{'='*60}")
     
     # Create prompt-specific directory
     prompt_dir = ensure_prompt_dir(data_dir, prompt_id)
     
-    # Normalize prompt formatting
-    try:
-        from Prompt_translation import normalize_text
-        prompt_text = normalize_text(prompt_text)
-    except Exception:
-        # Fallback to original prompt if normalization import fails
-        pass
-    
-    # 1) Translate
-    print("Translating prompt to multiple languages...")
-    translations = translate_prompt(prompt_text)
+    # 1) Translate (unless pre-translated)
+    if translations is None:
+        print("Translating prompt to multiple languages...")
+        if translation_session is None:
+            with open_translation_session(data_dir) as own_translation_session:
+                translations = translate_prompt(normalize_prompt_text(prompt_text), own_translation_session)
+        else:
+            translations = translate_prompt(normalize_prompt_text(prompt_text), translation_session)
     translated_path = os.path.join(prompt_dir, "translated_prompts.json")
     with open(translated_path, "w", encoding="utf-8") as f:
         json.dump(translations, f, ensure_ascii=False, indent=2)
     print(f"Saved translations to {translated_path}")
     
-    # 2) Query LLM (Transformers with LLMv2.py)
-    llm_outputs = query_llm_for_translations(translations, model_name=model_name)
+    # 2) Query LLM through the selected generation backend
+    generation_start = time.perf_counter()
+    parsed = None
+    if stream:
+        llm_outputs, llm_stats, parsed = generate_and_parse_streaming(translations, session)
+    else:
+        llm_outputs, llm_retries = query_llm_for_translations(translations, session)
+        llm_stats = {"retries": llm_retries}
+    log_prompt_generation(prompt_id, time.perf_counter() - generation_start, session.load_seconds)
     llm_out_path = os.path.join(prompt_dir, "llm_output.json")
     with open(llm_out_path, "w", encoding="utf-8") as f:
         json.dump(llm_outputs, f, ensure_ascii=False, indent=2)
     print(f"Saved LLM outputs to {llm_out_path}")
+    # Generation stats live beside llm_output.json so the parser still sees lang -> code only
+    llm_stats_path = os.path.join(prompt_dir, "llm_stats.json")
+    with open(llm_stats_path, "w", encoding="utf-8") as f:
+        json.dump(llm_stats, f, ensure_ascii=False, indent=2)
+    print(f"Saved LLM generation stats to {llm_stats_path}")
     
-    # 3) Parse
-    parsed = parse_llm_outputs(llm_outputs)
+    # 3) Parse (already done alongside generation in streaming mode)
+    if parsed is None:
+        parsed = parse_llm_outputs(llm_outputs)
     parsed_path = os.path.join(prompt_dir, "llm_parsed.json")
     with open(parsed_path, "w", encoding="utf-8") as f:
         json.dump(parsed, f, ensure_ascii=False, indent=2)
@@ -236,20 +503,48 @@ def visualize_language_distribution_for_prompt(prompt_dir: str) -> None:
     non_english.run_visualization(input_path, charts_dir, summary_out)
 
 
+def get_arg_value(args: List[str], flag: str, convert=str):
+    """Return the value following ``flag`` in ``args`` (converted), or None if absent."""
+    if flag in args:
+        idx = args.index(flag)
+        if idx + 1 < len(args):
+            return convert(args[idx + 1])
+    return None
+
+
 def main() -> None:
     project_root = ensure_dirs()
     data_dir = os.path.join(project_root, "data")
     setup_logger()
 
-    # Parse command line arguments
-    model_name = None
-    
     # Simple argument parsing
     args = sys.argv[1:]
-    if "--model" in args:
-        model_idx = args.index("--model")
-        if model_idx + 1 < len(args):
-            model_name = args[model_idx + 1]
+    model_name = get_arg_value(args, "--model")
+    max_batch_size = get_arg_value(args, "--batch-size", int)
+    stream = "--stream" in args
+    backend_name = get_arg_value(args, "--backend") or "transformers"
+    base_url = get_arg_value(args, "--backend-url")
+    
+    # One translator, cache and event loop for the whole run
+    translation_session = open_translation_session(
+        data_dir,
+        translator_name=get_arg_value(args, "--translator") or "googletrans",
+        model_name=get_arg_value(args, "--translator-model"),
+        replay_dir=get_arg_value(args, "--replay-dir"),
+        concurrency=get_arg_value(args, "--translate-concurrency", int),
+        timeout=get_arg_value(args, "--translate-timeout", float),
+        use_cache="--no-translation-cache" not in args,
+        max_attempts=get_arg_value(args, "--translate-attempts", int),
+    )
+    
+    backend_options: Dict[str, Any] = {}
+    if backend_name == "transformers":
+        # Generation throttle; disabled (no delay) unless one of these is given
+        from LLMv2 import GenerationGovernor
+        backend_options["governor"] = GenerationGovernor(
+            max_tokens_per_second=get_arg_value(args, "--max-tokens-per-sec", float),
+            duty_cycle=get_arg_value(args, "--duty-cycle", float),
+        )
     
     # Filter out our custom arguments to find the JSON file
     json_file = None
@@ -258,40 +553,72 @@ def main() -> None:
             json_file = arg
             break
 
-    # Check for JSON input file
-    if json_file:
-        try:
-            prompts = load_prompts_from_json(json_file)
-            print(f"Loaded {len(prompts)} prompts from {json_file}")
+    try:
+        if "--retry-failed" in args:
+            translate_start = time.perf_counter()
+            retried_prompts, _ = retry_failed_translations(data_dir, translation_session)
+            log_translation_stage(retried_prompts, time.perf_counter() - translate_start, translation_session.cache,
+                                  translation_session.retry)
+            return
+        
+        # Check for JSON input file
+        if json_file:
+            try:
+                prompts = load_prompts_from_json(json_file)
+                print(f"Loaded {len(prompts)} prompts from {json_file}")
             
-            # Process each prompt
-            for i, prompt_data in enumerate(prompts, 1):
-                print(f"\nProcessing prompt {i}/{len(prompts)}")
-                process_single_prompt(prompt_data, data_dir, model_name=model_name)
+                # Translate every prompt up front in one concurrent pass
+                print("Translating all prompts to multiple languages...")
+                translate_start = time.perf_counter()
+                all_translations = translate_all_prompts(prompts, translation_session)
+                log_translation_stage(len(prompts), time.perf_counter() - translate_start, translation_session.cache,
+                                      translation_session.retry)
             
-            print(f"\n{'='*60}")
-            print("All prompts processed successfully!")
-            print(f"Results saved in individual folders under: {data_dir}")
-            print(f"{'='*60}")
+                # Create the backend once; every prompt reuses the same session
+                session = load_generation_backend(backend_name, model_name, base_url, max_batch_size, **backend_options)
             
-        except Exception as e:
-            print(f"Error processing JSON file: {e}")
-            return
-    else:
-        # Fallback to single prompt input for backward compatibility
-        prompt_text = input("Enter the base prompt (in English): ").strip()
-        if not prompt_text:
-            print("Empty prompt; aborting.")
-            return
-
-        # Create a single prompt data structure
-        prompt_data = {
-            'id': 'single_prompt',
-            'text': prompt_text
-        }
+                # Process each prompt
+                try:
+                    for i, prompt_data in enumerate(prompts, 1):
+                        print(f"\nProcessing prompt {i}/{len(prompts)}")
+                        process_single_prompt(prompt_data, data_dir, session, stream=stream,
+                                              translations=all_translations.get(prompt_data['id']))
+                finally:
+                    session.close()
+            
+                print(f"\n{'='*60}")
+                print("All prompts processed successfully!")
+                print(f"Results saved in individual folders under: {data_dir}")
+                print(f"{'='*60}")
+            
+            except Exception as e:
+                print(f"Error processing JSON file: {e}")
+                return
+        else:
+            # Fallback to single prompt input for backward compatibility
+            prompt_text = input("Enter the base prompt (in English): ").strip()
+            if not prompt_text:
+                print("Empty prompt; aborting.")
+                return
+
+            # Create a single prompt data structure
+            prompt_data = {
+                'id': 'single_prompt',
+                'text': prompt_text
+            }
         
-        process_single_prompt(prompt_data, data_dir, model_name=model_name)
-        print("Pipeline complete.")
+            session = load_generation_backend(backend_name, model_name, base_url, max_batch_size, **backend_options)
+            try:
+                translate_start = time.perf_counter()
+                translations = translate_prompt(normalize_prompt_text(prompt_text), translation_session)
+                log_translation_stage(1, time.perf_counter() - translate_start, translation_session.cache,
+                                      translation_session.retry)
+                process_single_prompt(prompt_data, data_dir, session, stream=stream, translations=translations)
+            finally:
+                session.close()
+            print("Pipeline complete.")
+    finally:
+        translation_session.close()
 
 
 if __name__ == "__main__":
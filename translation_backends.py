@@ -0,0 +1,251 @@
+"""
+Translation backends for the pipeline.
+
+Every backend translates English prompt text into a target language code, so
+Prompt_translation.py does not care where translation runs:
+
+    googletrans  Google Translate through googletrans (needs network access)
+    replay       answers from existing data/*/translated_prompts.json files (offline)
+    local        local machine-translation model through transformers (NLLB by default)
+
+Backends declare whether they can translate several texts in one call
+(``supports_batch``) and the largest total number of characters per call
+(``max_batch_chars``, None for no limit); Prompt_translation packs prompts
+into batches under that budget. Optional dependencies are only
+imported when the backend that needs them is created.
+"""
+
+import asyncio
+import glob
+import inspect
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+
+TRANSLATOR_NAMES = ("googletrans", "replay", "local")
+
+DEFAULT_LOCAL_MODEL = "facebook/nllb-200-distilled-600M"
+
+# Target language codes (see Prompt_translation.TARGET_LANG_CODES) -> NLLB-200 codes
+NLLB_LANG_CODES: Dict[str, str] = {
+    "en": "eng_Latn",
+    "zh-CN": "zho_Hans",
+    "hi": "hin_Deva",
+    "es": "spa_Latn",
+    "ar": "arb_Arab",
+    "fr": "fra_Latn",
+    "bn": "ben_Beng",
+    "pt": "por_Latn",
+    "ru": "rus_Cyrl",
+    "id": "ind_Latn",
+    "ur": "urd_Arab",
+    "de": "deu_Latn",
+    "ja": "jpn_Jpan",
+    "mr": "mar_Deva",
+    "vi": "vie_Latn",
+    "te": "tel_Telu",
+    "ha": "hau_Latn",
+    "tr": "tur_Latn",
+}
+
+
+def replay_key(text: str) -> str:
+    return " ".join(text.split())
+
+
+class TranslationInputError(ValueError):
+    """The request itself cannot be translated (unsupported language, missing replay record).
+
+    Raised before anything is sent, so retrying the same request cannot help.
+    """
+
+
+class MissingTranslationError(TranslationInputError, LookupError):
+    """The replay translator has no recorded translation for a text."""
+
+
+class TranslationBackend(ABC):
+    """Base class for translation backends.
+
+    Subclasses implement ``translate(text, dest)``, returning the translation or
+    raising on failure. Backends with ``supports_batch`` also override
+    ``translate_batch`` to translate several texts into one language per call;
+    it returns one entry per text (None for texts it could not translate) and
+    raises only when the whole batch failed.
+    """
+
+    name = "base"
+    supports_batch = False
+    max_batch_chars: Optional[int] = None
+    # Whether results are worth keeping in the persistent translation cache
+    cacheable = True
+
+    @abstractmethod
+    def translate(self, text: str, dest: str) -> str:
+        """Translation of ``text`` into language code ``dest``."""
+
+    def translate_batch(self, texts: List[str], dest: str) -> List[Optional[str]]:
+        return [self.translate(text, dest) for text in texts]
+
+    def close(self) -> None:
+        pass
+
+
+class GoogleTransBackend(TranslationBackend):
+    """googletrans client.
+
+    googletrans sends one request per string, so a batch is sent as a single
+    newline-separated text and split back into segments. Texts that contain a
+    newline themselves are left out of the joined request, and if the service
+    merged or split lines the segments are discarded; either way those texts
+    come back as None, and the caller sends them one request (and one retry
+    budget) each.
+
+    The underlying HTTP client keeps its keep-alive connection pool for the
+    backend's lifetime, so create one backend per run and ``close`` it at the end.
+    """
+
+    name = "googletrans"
+    supports_batch = True
+    # Google Translate rejects texts over 5000 characters
+    max_batch_chars = 4500
+    SEGMENT_SEPARATOR = "\n"
+
+    def __init__(self, service_urls: Optional[List[str]] = None):
+        from googletrans import Translator
+        from googletrans.constants import LANGUAGES, LANGCODES, SPECIAL_CASES
+
+        self.client = Translator(service_urls=service_urls or ["translate.googleapis.com"])
+        self._language_codes = set(LANGUAGES) | set(LANGCODES) | set(SPECIAL_CASES)
+
+    def close(self) -> None:
+        http_client = getattr(self.client, "client", None)
+        if http_client is not None and hasattr(http_client, "close"):
+            http_client.close()
+
+    def translate(self, text: str, dest: str) -> str:
+        # googletrans raises a plain ValueError for this too, but so do its
+        # response parsing errors; only the bad code is not worth retrying
+        if dest.lower().split("_", 1)[0] not in self._language_codes:
+            raise TranslationInputError(f"googletrans does not support language '{dest}'")
+        result = self.client.translate(text, dest=dest)
+        # Newer googletrans releases are async; this runs on a worker thread with no loop
+        if inspect.isawaitable(result):
+            result = asyncio.run(result)
+        return result.text.strip()
+
+    def translate_batch(self, texts: List[str], dest: str) -> List[Optional[str]]:
+        results: List[Optional[str]] = [None] * len(texts)
+        single_line = [i for i, text in enumerate(texts) if self.SEGMENT_SEPARATOR not in text]
+        if len(single_line) == 1:
+            results[single_line[0]] = self.translate(texts[single_line[0]], dest)
+        elif single_line:
+            joined = self.SEGMENT_SEPARATOR.join(texts[i] for i in single_line)
+            segments = self.translate(joined, dest).split(self.SEGMENT_SEPARATOR)
+            if len(segments) == len(single_line):
+                for i, segment in zip(single_line, segments):
+                    results[i] = segment.strip()
+        return results
+
+
+class ReplayBackend(TranslationBackend):
+    """Replays translations recorded by earlier runs.
+
+    Reads every ``<root>/*/translated_prompts.json`` and indexes the recorded
+    translations by their English ("en") text. Texts or languages that were
+    never translated successfully raise ``MissingTranslationError``.
+    """
+
+    name = "replay"
+    supports_batch = True
+    cacheable = False
+
+    def __init__(self, root: str = "data"):
+        self.root = root
+        self._index: Dict[str, Dict[str, str]] = {}
+        for path in sorted(glob.glob(os.path.join(root, "*", "translated_prompts.json"))):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    translations = json.load(f)
+            except (OSError, ValueError):
+                continue
+            source = translations.get("en") if isinstance(translations, dict) else None
+            if not source:
+                continue
+            recorded = self._index.setdefault(replay_key(source), {})
+            for code, text in translations.items():
+                if text is not None:
+                    recorded[code] = text
+        print(f"Replay translator: {len(self._index)} recorded prompts under {root}")
+
+    def translate(self, text: str, dest: str) -> str:
+        translation = self._index.get(replay_key(text), {}).get(dest)
+        if translation is None:
+            raise MissingTranslationError(f"no recorded '{dest}' translation for this prompt")
+        return translation
+
+    def translate_batch(self, texts: List[str], dest: str) -> List[Optional[str]]:
+        return [self._index.get(replay_key(text), {}).get(dest) for text in texts]
+
+
+class LocalModelBackend(TranslationBackend):
+    """Local machine-translation model.
+
+    By default loads an NLLB-200 checkpoint with transformers and translates
+    batches on the device. Any other model can be plugged in by passing
+    ``translate_fn(texts, dest) -> translations`` instead.
+    """
+
+    name = "local"
+    supports_batch = True
+    max_batch_chars = 4000
+
+    def __init__(self, model_name: str = DEFAULT_LOCAL_MODEL, device: Optional[str] = None,
+                 max_new_tokens: int = 512, translate_fn: Optional[Callable[[List[str], str], List[str]]] = None):
+        self.model_name = model_name
+        self.max_new_tokens = max_new_tokens
+        self.translate_fn = translate_fn
+        # Translations are submitted from several worker threads; run one batch at a time
+        self._lock = threading.Lock()
+        if translate_fn is not None:
+            return
+
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        self.torch = torch
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, src_lang=NLLB_LANG_CODES["en"])
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).to(self.device)
+        self.model.eval()
+
+    def translate(self, text: str, dest: str) -> str:
+        return self.translate_batch([text], dest)[0]
+
+    def translate_batch(self, texts: List[str], dest: str) -> List[str]:
+        if self.translate_fn is not None:
+            return list(self.translate_fn(texts, dest))
+        if dest not in NLLB_LANG_CODES:
+            raise TranslationInputError(f"No NLLB language code for '{dest}'")
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
+        with self._lock, self.torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(NLLB_LANG_CODES[dest]),
+                max_new_tokens=self.max_new_tokens,
+            )
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+def create_translator(name: str = "googletrans", **options) -> TranslationBackend:
+    """Build a translation backend by name; ``options`` go to the backend constructor."""
+    if name == "googletrans":
+        return GoogleTransBackend(**options)
+    if name == "replay":
+        return ReplayBackend(**options)
+    if name == "local":
+        return LocalModelBackend(**options)
+    raise ValueError(f"Unknown translator '{name}'; expected one of {', '.join(TRANSLATOR_NAMES)}")
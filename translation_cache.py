@@ -0,0 +1,94 @@
+"""
+Persistent on-disk translation cache.
+
+Translations are stored in an append-only JSONL file (data/translation_cache.jsonl
+by default), one ``{"key": ..., "lang": ..., "text": ...}`` record per line.
+The key is the SHA-256 of the normalized source text plus the target language
+code, so the same prompt is never sent to the translator twice across runs.
+The whole file is loaded into an in-memory index on open; later lines win, and
+a truncated last line (e.g. from an interrupted run) is ignored.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join("data", "translation_cache.jsonl")
+
+
+def cache_key(text: str, language_code: str) -> str:
+    """Content address for ``text`` translated into ``language_code``."""
+    # Whitespace differences never change the translation request
+    normalized = " ".join(text.split())
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"{digest}:{language_code}"
+
+
+class TranslationCache:
+    """Append-only JSONL translation cache with an in-memory index and hit/miss stats."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._index: Dict[str, str] = {}
+        self._file = None
+        # Translations complete on worker threads
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._index[record["key"]] = record["text"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, text: str, language_code: str) -> Optional[str]:
+        """Return the cached translation, or None on a miss."""
+        translation = self._index.get(cache_key(text, language_code))
+        with self._lock:
+            if translation is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return translation
+
+    def put(self, text: str, language_code: str, translation: Optional[str]) -> None:
+        """Record a successful translation; failed (None) translations are not cached."""
+        if translation is None:
+            return
+        key = cache_key(text, language_code)
+        with self._lock:
+            if self._index.get(key) == translation:
+                return
+            self._index[key] = translation
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            record = {"key": key, "lang": language_code, "text": translation}
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.writes += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._index), "hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
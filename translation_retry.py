@@ -0,0 +1,185 @@
+"""
+Retries, circuit breaking and failure logging for translation calls.
+
+Every translator call made by Prompt_translation goes through
+``TranslationRetry.run``, which:
+
+    - retries failed calls up to ``max_attempts`` times with jittered
+      exponential backoff ("full jitter": a random delay up to
+      ``base_delay * 2**attempt``, capped at ``max_delay``)
+    - waits while the translator's circuit breaker is open, so a failing
+      service gets a pause instead of a stream of doomed requests
+    - appends one JSON record per failed attempt to the failure log
+      (data/translation_failures.jsonl in the pipeline)
+
+Errors that retrying cannot fix (``TranslationInputError``: unknown language
+codes, missing replay records) are not retried and count as a live service
+for the breaker. Everything else, including the ValueError/LookupError that
+googletrans raises when it cannot parse a throttled or blocked response, is
+retried and counts as a failure.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from translation_backends import TranslationInputError
+
+
+DEFAULT_FAILURE_LOG = os.path.join("data", "translation_failures.jsonl")
+
+NON_RETRYABLE_ERRORS = (TranslationInputError,)
+
+
+class CircuitBreaker:
+    """Per-translator circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens for
+    ``reset_timeout`` seconds and calls wait. Afterwards a single trial call
+    is let through (half-open) while the others keep waiting: a success
+    closes the circuit, a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.times_opened = 0
+        self.half_open = False
+        self._trial_in_flight = False
+        self._trials_started = 0
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self.opened_until
+
+    async def wait(self) -> Optional[int]:
+        """Return once a call may be made: the trial's id if it is the half-open trial, else None."""
+        while True:
+            remaining = self.opened_until - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            if self.half_open:
+                if self._trial_in_flight:
+                    await asyncio.sleep(min(1.0, self.reset_timeout / 10))
+                    continue
+                self._trial_in_flight = True
+                self._trials_started += 1
+                return self._trials_started
+            return None
+
+    def release_trial(self, trial: Optional[int]) -> None:
+        """Let another caller make the half-open trial if ``trial`` ended without recording an outcome."""
+        if trial is not None and trial == self._trials_started:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.half_open = False
+        self._trial_in_flight = False
+
+    def record_failure(self, trial: Optional[int] = None) -> None:
+        """Count a failed call; ``trial`` is the id ``wait`` returned for it.
+
+        Only the current trial's failure reopens a half-open circuit: a call that
+        started before the circuit opened and fails late does not.
+        """
+        self.consecutive_failures += 1
+        trial_failed = self.half_open and self._trial_in_flight and trial is not None and trial == self._trials_started
+        if trial_failed or (self.consecutive_failures >= self.failure_threshold and not self.half_open):
+            self.opened_until = time.monotonic() + self.reset_timeout
+            self.times_opened += 1
+            self.half_open = True
+            self._trial_in_flight = False
+            print(f"Translation circuit open: pausing calls for {self.reset_timeout:g}s")
+
+
+class FailureLog:
+    """Append-only JSONL log with one record per failed translation attempt."""
+
+    def __init__(self, path: str = DEFAULT_FAILURE_LOG):
+        self.path = path
+        self.records = 0
+        self._lock = threading.Lock()
+
+    def record(self, translator: str, language_code: str, texts: List[str], attempt: int,
+               error: BaseException, gave_up: bool) -> None:
+        record = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "translator": translator,
+            "lang": language_code,
+            "attempt": attempt,
+            "gave_up": gave_up,
+            "error_type": type(error).__name__,
+            "error": str(error) or repr(error),
+            "segments": len(texts),
+            "chars": sum(len(text) for text in texts),
+            "text_sha256": [hashlib.sha256(text.encode("utf-8")).hexdigest()[:16] for text in texts],
+            "preview": texts[0][:80] if texts else "",
+        }
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.records += 1
+
+
+class TranslationRetry:
+    """Retry policy, circuit breaker and failure log for one translator."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 breaker: Optional[CircuitBreaker] = None, failure_log: Optional[FailureLog] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.failure_log = failure_log
+        self.retries = 0
+        self.failures = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retry number ``attempt`` (zero-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def run(self, call: Callable[[], Awaitable], translator: str, language_code: str, texts: List[str],
+                  timeout: Optional[float] = None):
+        """Await ``call()`` (a fresh awaitable per attempt) with retries; re-raises the last error."""
+        for attempt in range(1, self.max_attempts + 1):
+            trial = await self.breaker.wait()
+            try:
+                result = await asyncio.wait_for(call(), timeout)
+            except Exception as exc:
+                if isinstance(exc, asyncio.TimeoutError):
+                    exc = TimeoutError(f"timed out after {timeout}s")
+                retryable = not isinstance(exc, NON_RETRYABLE_ERRORS)
+                gave_up = not retryable or attempt == self.max_attempts
+                if retryable:
+                    self.breaker.record_failure(trial)
+                else:
+                    # The service answered; the request itself was the problem
+                    self.breaker.record_success()
+                if self.failure_log is not None:
+                    self.failure_log.record(translator, language_code, texts, attempt, exc, gave_up)
+                if gave_up:
+                    self.failures += 1
+                    raise exc
+                self.retries += 1
+                await asyncio.sleep(self.backoff(attempt - 1))
+                continue
+            finally:
+                # Normally record_success/record_failure already settled the trial;
+                # if the call was cancelled or interrupted, free it or every later
+                # caller would wait forever
+                self.breaker.release_trial(trial)
+            self.breaker.record_success()
+            return result